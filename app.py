@@ -6,9 +6,12 @@ import requests
 import pandas as pd
 import time
 import uuid
+import threading
 import plotly.express as px
 from io import BytesIO
 from zipfile import ZipFile
+from collections import Counter
+import artifact_format
 
 
 # -------------------------------
@@ -19,6 +22,20 @@ WORKFLOW_ID = "scraper.yml"
 GITHUB_TOKEN = st.secrets["GITHUB_TOKEN"]
 ARTIFACT_NAME = "scraped_data"  # fallback name
 
+# -------------------------------
+# Warm up the sentiment model once per server process
+# -------------------------------
+@st.cache_resource(show_spinner=False)
+def start_sentiment_warmup():
+    import sentiment_model
+    if sentiment_model.SENTIMENT_SERVER_URL:
+        return None  # the sentiment server keeps the model warm instead
+    thread = threading.Thread(target=sentiment_model.warm_up, daemon=True)
+    thread.start()
+    return thread
+
+start_sentiment_warmup()
+
 # -------------------------------
 # Dashboard Title
 # -------------------------------
@@ -99,11 +116,10 @@ def fetch_artifact_csv(repo, token, artifact_name=ARTIFACT_NAME):
         st.error("❌ Failed to download Dataset.")
         return None
 
+    # (posts, comments): the typed Parquet tables when the run uploaded them,
+    # otherwise the wide CSV split into the same two tables.
     zipfile = ZipFile(BytesIO(r.content))
-    csv_filename = zipfile.namelist()[0]
-    with zipfile.open(csv_filename) as f:
-        df = pd.read_csv(f)
-    return df
+    return artifact_format.read_tables(zipfile.namelist(), zipfile.read)
 
 # -------------------------------
 # SCRAPE BUTTON
@@ -185,47 +201,63 @@ if report_clicked and st.session_state.get("scrape_done", False):
     # st.info(f"📦 Fetching artifact `{artifact_name}` ...")
     st.info(f"📦 Fetching Dataset `{artifact_name}` ...")
 
-    df = fetch_artifact_csv(REPO, GITHUB_TOKEN, artifact_name)
-    if df is None or df.empty:
+    tables = fetch_artifact_csv(REPO, GITHUB_TOKEN, artifact_name)
+    if tables is None or tables[1].empty:
         st.warning("⚠️ No data found in your artifact.")
         st.stop()
+    posts, comments = tables
 
     # -------------------------------
     # Sentiment Analysis Integration
     # -------------------------------
     import sentiment_model
 
-    if "Comments" in df.columns and not df["Comments"].isna().all():
-        st.info("🧠 Running Sentiment Analysis on Comments...")
-        df = sentiment_model.analyze_comments(df, column="Comments")
+    if not comments["Comments"].isna().all():
+        progress_bar = st.progress(0.0, text="🧠 Running Sentiment Analysis on Comments...")
+        partial_summary = st.empty()
+
+        def show_progress(done, total):
+            progress_bar.progress(done / total, text=f"🧠 Analyzed {format_indian_number(done)} of {format_indian_number(total)} comments")
+
+        scored_chunks = []
+        running_counts = Counter()
+        for chunk in sentiment_model.analyze_comments_iter(comments, column="Comments", chunk_size=2000, progress_callback=show_progress):
+            scored_chunks.append(chunk)
+            running_counts.update(chunk["Sentiment_label"].value_counts().to_dict())
+            scored = sum(running_counts.values())
+            partial_summary.caption(
+                f"So far: 🙂 {running_counts['positive'] / scored * 100:.1f}% | "
+                f"😡 {running_counts['negative'] / scored * 100:.1f}% | "
+                f"😐 {running_counts['neutral'] / scored * 100:.1f}%"
+            )
+        comments = pd.concat(scored_chunks)
+        partial_summary.empty()
         st.success("✅ Sentiment Analysis Completed!")
 
-    st.session_state["scraped_df"] = df
+    # Comments are indexed by post_id (sorted), so a post's comments are a slice.
+    st.session_state["scraped_posts"] = posts
+    st.session_state["scraped_comments"] = comments.set_index("post_id")
     st.success("✅ Your report is ready!")
 
 # -------------------------------
 # DISPLAY REPORT
 # -------------------------------
-if "scraped_df" in st.session_state:
-    df = st.session_state["scraped_df"]
-
-    # Clean up data
-    df["Likes"] = df["Likes"].astype(str).str.replace(",", "").str.strip()
-    df["Likes"] = pd.to_numeric(df["Likes"], errors="coerce").fillna(0)
-    df["Date"] = pd.to_datetime(df["Date"], errors="coerce")
-    df["Time"] = pd.to_datetime(df["Time"], format='%H:%M:%S', errors="coerce").dt.time
-    df["Comments"] = df["Comments"].replace("", pd.NA)
+if "scraped_posts" in st.session_state:
+    posts = st.session_state["scraped_posts"]
+    comments = st.session_state["scraped_comments"]
+    if "Sentiment_label" not in comments.columns:
+        comments["Sentiment_label"] = pd.NA
 
     # -------------------------------
     # Overall Overview (All Users)
     # -------------------------------
     st.markdown("## 📊 Overall Overview")
 
-    total_posts = df["URL"].nunique()
-    total_likes = df["Likes"].sum()
-    total_comments = df["Comments"].notna().sum()
+    total_posts = len(posts)
+    total_likes = posts["Likes"].sum()
+    total_comments = comments["Comments"].notna().sum()
 
-    all_comments = df[df["Comments"].notna()]
+    all_comments = comments[comments["Comments"].notna()]
     sentiment_counts = (
         all_comments["Sentiment_label"].astype(str).str.strip().str.title().value_counts(normalize=True) * 100
     )
@@ -254,7 +286,7 @@ if "scraped_df" in st.session_state:
     })
     
     # Prepare top hashtags (overall)
-    hashtags_list_overall = df['Hashtags'].dropna().tolist()
+    hashtags_list_overall = posts['Hashtags'].dropna().tolist()
     all_hashtags_overall = []
     for h in hashtags_list_overall:
         all_hashtags_overall.extend([tag.strip() for tag in h.split(",")])
@@ -338,20 +370,31 @@ if "scraped_df" in st.session_state:
     # -------------------------------
     # Profile Summary Table with Sentiment
     # -------------------------------
-    if "username" in df.columns:
+    if "username" in posts.columns:
         st.markdown("## 👥 Profile Summary")
-        summary_df = df.groupby("username").agg(
-            Total_Posts=("URL", "nunique"),
+        # Sentiment counts per post, then summed per profile over the posts table.
+        labels = all_comments["Sentiment_label"].astype(str).str.strip().str.title()
+        post_sentiment = labels.groupby(level="post_id").value_counts().unstack(fill_value=0)
+        post_sentiment = post_sentiment.reindex(columns=post_sentiment.columns.union(["Positive", "Negative", "Neutral"]), fill_value=0)
+        post_sentiment["Total_Comments"] = post_sentiment.sum(axis=1)
+        post_stats = posts[["post_id", "username", "Likes"]].join(post_sentiment, on="post_id").fillna(0)
+        summary_df = post_stats.groupby("username", observed=True).agg(
+            Total_Posts=("post_id", "size"),
             Total_Likes=("Likes", "sum"),
-            Total_Comments=("Comments", lambda x: x.notna().sum()),
+            Total_Comments=("Total_Comments", "sum"),
+            Positive=("Positive", "sum"),
+            Negative=("Negative", "sum"),
+            Neutral=("Neutral", "sum"),
         ).reset_index()
+        summary_df["username"] = summary_df["username"].astype(str)
+        summary_df = summary_df.sort_values("username", ignore_index=True)
 
         sentiments_list = []
-        for user in summary_df["username"]:
-            user_comments = df[(df["username"]==user) & (df["Comments"].notna())]
-            scounts = (user_comments["Sentiment_label"].astype(str).str.strip().str.title().value_counts(normalize=True)*100)
-            sentiments_list.append(f"🙂 {scounts.get('Positive',0):.1f}% | 😡 {scounts.get('Negative',0):.1f}% | 😐 {scounts.get('Neutral',0):.1f}%")
+        for _, user_row in summary_df.iterrows():
+            total = user_row["Total_Comments"] or 1
+            sentiments_list.append(f"🙂 {user_row['Positive'] / total * 100:.1f}% | 😡 {user_row['Negative'] / total * 100:.1f}% | 😐 {user_row['Neutral'] / total * 100:.1f}%")
         summary_df["Sentiment"] = sentiments_list
+        summary_df = summary_df.drop(columns=["Positive", "Negative", "Neutral"])
 
         summary_df["Total_Likes"] = summary_df["Total_Likes"].apply(format_indian_number)
         summary_df["Total_Comments"] = summary_df["Total_Comments"].apply(format_indian_number)
@@ -369,13 +412,14 @@ if "scraped_df" in st.session_state:
         
         for selected_user in selected_users:
             st.markdown(f"## 👤 User Overview: {selected_user}")
-            filtered = df[df["username"] == selected_user]
+            filtered = posts[posts["username"] == selected_user]
+            filtered_comments = comments[comments.index.isin(filtered["post_id"])]
 
-            total_posts = filtered["URL"].nunique()
+            total_posts = len(filtered)
             total_likes = filtered["Likes"].sum()
-            total_comments = filtered["Comments"].notna().sum()
+            total_comments = filtered_comments["Comments"].notna().sum()
 
-            all_comments_user = filtered[filtered["Comments"].notna()]
+            all_comments_user = filtered_comments[filtered_comments["Comments"].notna()]
             sentiment_counts_user = (all_comments_user["Sentiment_label"].astype(str).str.strip().str.title().value_counts(normalize=True)*100)
             pos_pct = sentiment_counts_user.get("Positive", 0.0)
             neg_pct = sentiment_counts_user.get("Negative", 0.0)
@@ -491,7 +535,7 @@ if "scraped_df" in st.session_state:
 
             # User-wise Post Exploration
             st.markdown(f"### 📌 Explore Posts: {selected_user}")
-            post_urls_user = filtered["URL"].unique().tolist()
+            post_urls_user = filtered["URL"].tolist()
             selected_posts_user = st.multiselect(
                 f"🔗 Select Posts for {selected_user}",
                 post_urls_user,
@@ -503,82 +547,80 @@ if "scraped_df" in st.session_state:
                 st.subheader(f"📝 Selected Posts Details: {selected_user}")
 
                 for url in selected_posts_user:
-                    post_group = multi_posts_user[multi_posts_user["URL"] == url]
-                    caption_row = post_group[post_group["Caption"].notna()]
+                    row = multi_posts_user[multi_posts_user["URL"] == url].iloc[0]
+                    post_group = comments.loc[row["post_id"]:row["post_id"]]
 
                     # Total comments for this post
                     total_comments_post = post_group["Comments"].notna().sum()
 
-                    if not caption_row.empty:
-                        row = caption_row.iloc[0]
+                    # Format likes and comments
+                    likes_formatted = format_indian_number(row["Likes"])
+                    comments_formatted = format_indian_number(total_comments_post)
 
-                        # Format likes and comments
-                        likes_formatted = format_indian_number(row["Likes"])
-                        comments_formatted = format_indian_number(total_comments_post)
+                    st.markdown(
+                        f"**Caption:** {row['Caption'] if pd.notna(row['Caption']) else ''} 🔗 [View Post]({url})  \n\n"
+                        f"📅 {row['Date'].date()}  🕒 {row['Time']}  ❤️ Likes: {likes_formatted}  💬 Comments: {comments_formatted}  \n"
+                    )
 
-                        st.markdown(
-                            f"**Caption:** {row['Caption']} 🔗 [View Post]({url})  \n\n"
-                            f"📅 {row['Date'].date()}  🕒 {row['Time']}  ❤️ Likes: {likes_formatted}  💬 Comments: {comments_formatted}  \n"
+                    # Calculate post sentiment (if comments exist)
+                    comments_with_sentiment = post_group[post_group["Comments"].notna()]
+                    if not comments_with_sentiment.empty and "Sentiment_label" in comments_with_sentiment.columns:
+                        sentiment_counts_post = (
+                            comments_with_sentiment["Sentiment_label"].astype(str).str.title().value_counts(normalize=True) * 100
                         )
 
-                        # Calculate post sentiment (if comments exist)
-                        comments_with_sentiment = post_group[post_group["Comments"].notna()]
-                        if not comments_with_sentiment.empty and "Sentiment_label" in comments_with_sentiment.columns:
-                            sentiment_counts_post = (
-                                comments_with_sentiment["Sentiment_label"].astype(str).str.title().value_counts(normalize=True) * 100
+                        # -------------------------
+                        # --- Plot Sentiment Only ---
+                        # -------------------------
+                        df_sentiment = pd.DataFrame({
+                            "Sentiment": ["🙂 Positive", "😡 Negative", "😐 Neutral"],
+                            "Percentage": [
+                                sentiment_counts_post.get("Positive", 0),
+                                sentiment_counts_post.get("Negative", 0),
+                                sentiment_counts_post.get("Neutral", 0)
+                            ]
+                        })
+                        
+                        # Create a column just for sentiment
+                        col_sent = st.container()
+                        
+                        with col_sent:
+                            y_max = df_sentiment["Percentage"].max()
+                            y_limit = y_max + 10  # Add small margin so labels don’t get cut
+                            fig_sent = px.bar(
+                                df_sentiment,
+                                x="Sentiment",
+                                y="Percentage",
+                                text="Percentage",
+                                color="Sentiment",
+                                color_discrete_map={
+                                    "🙂 Positive": "green",
+                                    "😡 Negative": "red",
+                                    "😐 Neutral": "gray"
+                                },
+                                title="Sentiment Distribution"
                             )
-
-                            # -------------------------
-                            # --- Plot Sentiment Only ---
-                            # -------------------------
-                            df_sentiment = pd.DataFrame({
-                                "Sentiment": ["🙂 Positive", "😡 Negative", "😐 Neutral"],
-                                "Percentage": [
-                                    sentiment_counts_post.get("Positive", 0),
-                                    sentiment_counts_post.get("Negative", 0),
-                                    sentiment_counts_post.get("Neutral", 0)
-                                ]
-                            })
-                            
-                            # Create a column just for sentiment
-                            col_sent = st.container()
-                            
-                            with col_sent:
-                                y_max = df_sentiment["Percentage"].max()
-                                y_limit = y_max + 10  # Add small margin so labels don’t get cut
-                                fig_sent = px.bar(
-                                    df_sentiment,
-                                    x="Sentiment",
-                                    y="Percentage",
-                                    text="Percentage",
-                                    color="Sentiment",
-                                    color_discrete_map={
-                                        "🙂 Positive": "green",
-                                        "😡 Negative": "red",
-                                        "😐 Neutral": "gray"
-                                    },
-                                    title="Sentiment Distribution"
-                                )
-                                fig_sent.update_traces(
-                                    texttemplate='%{text:.1f}%',
-                                    textposition='outside',
-                                    marker_line_width=0.5
-                                )
-                                fig_sent.update_layout(
-                                    yaxis_title="Percentage",
-                                    xaxis_title="",
-                                    showlegend=False,
-                                    uniformtext_minsize=12,
-                                    uniformtext_mode='hide',
-                                    yaxis=dict(range=[0, y_limit]),
-                                    title_x=0.4
-                                )
-                                st.plotly_chart(fig_sent, use_container_width=True, key=f"sent_chart_{selected_user}_{url}")
-                                # st.markdown("---")
-                
+                            fig_sent.update_traces(
+                                texttemplate='%{text:.1f}%',
+                                textposition='outside',
+                                marker_line_width=0.5
+                            )
+                            fig_sent.update_layout(
+                                yaxis_title="Percentage",
+                                xaxis_title="",
+                                showlegend=False,
+                                uniformtext_minsize=12,
+                                uniformtext_mode='hide',
+                                yaxis=dict(range=[0, y_limit]),
+                                title_x=0.4
+                            )
+                            st.plotly_chart(fig_sent, use_container_width=True, key=f"sent_chart_{selected_user}_{url}")
+                            # st.markdown("---")
+            
                 # Download Button for Selected Posts (User-wise)
-                download_df_user = multi_posts_user.copy()
-                download_df_user["Likes"] = download_df_user["Likes"].astype(int)
+                download_df_user = artifact_format.wide_frame(
+                    multi_posts_user, filtered_comments[filtered_comments.index.isin(multi_posts_user["post_id"])]
+                )
                 csv_bytes_user = download_df_user.to_csv(index=False).encode("utf-8")
                 st.download_button(
                     label=f"📥 Download Selected Posts for {selected_user}",
@@ -589,8 +631,7 @@ if "scraped_df" in st.session_state:
 
             # Download Overall User Data as Excel
             excel_buffer_user = BytesIO()
-            filtered_copy = filtered.copy()
-            filtered_copy["Likes"] = filtered_copy["Likes"].astype(int)
+            filtered_copy = artifact_format.wide_frame(filtered, filtered_comments)
             with pd.ExcelWriter(excel_buffer_user) as writer:
                 filtered_copy.to_excel(writer, index=False, sheet_name='User Data')
             excel_buffer_user.seek(0)
@@ -606,7 +647,7 @@ if "scraped_df" in st.session_state:
     # Full dataset download as Excel
     output = BytesIO()
     with pd.ExcelWriter(output) as writer:
-        df.to_excel(writer, index=False, sheet_name='Sheet1')
+        artifact_format.wide_frame(posts, comments).to_excel(writer, index=False, sheet_name='Sheet1')
     output.seek(0)
 
     st.download_button(
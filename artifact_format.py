@@ -0,0 +1,215 @@
+# ----------------------------------
+# artifact_format.py
+# ----------------------------------
+# Layout of the scraper artifact, shared by scraper.py (which writes it) and
+# app.py (which reads it).
+#
+# The scraper produces rows in the original wide layout: one row per
+# comment, with Date, Time, Likes, Caption and Hashtags only on a post's
+# first row. CSV keeps that layout as text ("1,234" or "Hidden" likes, blank
+# cells) for compatibility. Parquet stores two linked, typed tables instead:
+#   <artifact>_posts.parquet     one row per post: post_id, username,
+#                                Post_Number, URL, Date, Time, Likes (0 when
+#                                hidden), Caption, Hashtags
+#   <artifact>_comments.parquet  post_id, Comments (the comment text)
+# A post is one (username, URL) pair, since collab posts show up under
+# every profile that shares them.
+import csv
+from io import BytesIO
+
+import pandas as pd
+
+COLUMNS = ["username", "Post_Number", "URL", "Date", "Time", "Likes", "Caption", "Hashtags", "Comments"]
+POST_COLUMNS = ["post_id", "username", "Post_Number", "URL", "Date", "Time", "Likes", "Caption", "Hashtags"]
+COMMENT_COLUMNS = ["post_id", "Comments"]
+FORMATS = ("csv", "parquet")
+POSTS_SUFFIX = "_posts.parquet"
+COMMENTS_SUFFIX = "_comments.parquet"
+PARQUET_COMPRESSION = "zstd"
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError("Parquet artifacts need the pyarrow package.") from e
+    return pyarrow
+
+
+def posts_schema():
+    pa = _pyarrow()
+    return pa.schema([
+        ("post_id", pa.int32()),
+        ("username", pa.dictionary(pa.int32(), pa.string())),
+        ("Post_Number", pa.int32()),
+        ("URL", pa.string()),
+        ("Date", pa.timestamp("ms")),
+        ("Time", pa.time32("s")),
+        ("Likes", pa.int64()),
+        ("Caption", pa.string()),
+        ("Hashtags", pa.string()),
+    ])
+
+
+def comments_schema():
+    pa = _pyarrow()
+    return pa.schema([("post_id", pa.int32()), ("Comments", pa.string())])
+
+
+def artifact_paths(base_path, fmt):
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown artifact format: {fmt}")
+    if fmt == "parquet":
+        return [base_path + POSTS_SUFFIX, base_path + COMMENTS_SUFFIX]
+    return [f"{base_path}.csv"]
+
+
+def _blank_to_none(series):
+    return series.astype(object).where(series.notna() & (series.astype(str) != ""), None)
+
+
+def clean_frame(df):
+    """Coerce a text-typed wide artifact (as read from CSV) to typed columns."""
+    df["Likes"] = df["Likes"].astype(str).str.replace(",", "").str.strip()
+    df["Likes"] = pd.to_numeric(df["Likes"], errors="coerce").fillna(0)
+    df["Date"] = pd.to_datetime(df["Date"], errors="coerce")
+    df["Time"] = pd.to_datetime(df["Time"], format='%H:%M:%S', errors="coerce").dt.time
+    df["Comments"] = df["Comments"].replace("", pd.NA)
+    return df
+
+
+def is_typed(df):
+    return pd.api.types.is_numeric_dtype(df["Likes"]) and pd.api.types.is_datetime64_any_dtype(df["Date"])
+
+
+def _typed_posts(posts):
+    posts = posts[POST_COLUMNS].copy()
+    posts["post_id"] = posts["post_id"].astype("int32")
+    posts["Post_Number"] = pd.to_numeric(posts["Post_Number"]).astype("int32")
+    posts["Likes"] = posts["Likes"].astype("int64")
+    posts["username"] = posts["username"].astype(str).astype("category")
+    posts["URL"] = posts["URL"].astype(str)
+    for column in ("Caption", "Hashtags"):
+        posts[column] = _blank_to_none(posts[column])
+    return posts.reset_index(drop=True)
+
+
+def _typed_comments(comments):
+    comments = comments.copy()
+    comments["post_id"] = comments["post_id"].astype("int32")
+    comments["Comments"] = _blank_to_none(comments["Comments"])
+    return comments.reset_index(drop=True)
+
+
+def split_frame(df):
+    """Split a typed wide artifact into (posts, comments) tables.
+
+    Post fields are taken from each post's first row; post_id numbers posts
+    in order of first appearance.
+    """
+    key = df["username"].astype(str) + "\n" + df["URL"].astype(str)
+    codes, _ = pd.factorize(key)
+    df = df.assign(post_id=codes + 1)
+    posts = _typed_posts(df[~df["post_id"].duplicated()])
+    extra = [column for column in df.columns if column not in COLUMNS and column != "post_id"]
+    comments = _typed_comments(df[COMMENT_COLUMNS + extra])
+    return posts, comments
+
+
+def wide_frame(posts, comments):
+    """Join the tables back into the original one-row-per-comment layout."""
+    if "post_id" not in comments.columns:
+        comments = comments.reset_index()
+    wide = comments.merge(posts, on="post_id", how="left", sort=False)
+    later = wide["post_id"].duplicated()
+    wide.loc[later, ["Date", "Time", "Caption", "Hashtags"]] = None
+    wide.loc[later, "Likes"] = 0
+    extra = [column for column in comments.columns if column not in COMMENT_COLUMNS]
+    return wide[COLUMNS + extra]
+
+
+class CsvAppender:
+    """Writes successive batches of wide rows to one CSV file under a single header."""
+
+    def __init__(self, base_path):
+        self.paths = artifact_paths(base_path, "csv")
+        self._file = open(self.paths[0], "w", encoding="utf-8-sig", newline="")
+        self._writer = csv.DictWriter(self._file, fieldnames=COLUMNS, extrasaction="ignore")
+        self._writer.writeheader()
+
+    def write(self, rows):
+        self._writer.writerows(rows)
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class TablesAppender:
+    """Splits successive batches of wide rows into the posts and comments Parquet tables.
+
+    Each batch becomes one row group per table. A post's rows arrive
+    together, the first carrying the post fields; only the post ids handed
+    out so far are kept between batches.
+    """
+
+    def __init__(self, base_path, compression=PARQUET_COMPRESSION):
+        pa = _pyarrow()
+        self._pa = pa
+        self.paths = artifact_paths(base_path, "parquet")
+        self._post_ids = {}
+        self._posts = pa.parquet.ParquetWriter(self.paths[0], posts_schema(), compression=compression)
+        self._comments = pa.parquet.ParquetWriter(self.paths[1], comments_schema(), compression=compression)
+
+    def write(self, rows):
+        posts, comments = [], []
+        for row in rows:
+            key = (row["username"], row["URL"])
+            post_id = self._post_ids.get(key)
+            if post_id is None:
+                post_id = self._post_ids[key] = len(self._post_ids) + 1
+                posts.append(dict(row, post_id=post_id))
+            comments.append({"post_id": post_id, "Comments": row["Comments"]})
+        if posts:
+            posts = clean_frame(pd.DataFrame(posts, columns=COLUMNS + ["post_id"]))
+            self._write(self._posts, _typed_posts(posts))
+        self._write(self._comments, _typed_comments(pd.DataFrame(comments, columns=COMMENT_COLUMNS)))
+
+    def _write(self, writer, df):
+        writer.write_table(self._pa.Table.from_pandas(df, schema=writer.schema, preserve_index=False))
+
+    def close(self):
+        self._posts.close()
+        self._comments.close()
+
+
+def open_appender(base_path, fmt):
+    artifact_paths(base_path, fmt)
+    return TablesAppender(base_path) if fmt == "parquet" else CsvAppender(base_path)
+
+
+def read_tables(names, read):
+    """(posts, comments) from the files of one artifact.
+
+    names lists the files and read(name) returns a file's bytes. The Parquet
+    tables are used as stored; a wide CSV, or the single wide Parquet file of
+    older runs, is cleaned and split. comments come back sorted by post_id.
+    """
+    posts_name = next((name for name in names if name.endswith(POSTS_SUFFIX)), None)
+    comments_name = next((name for name in names if name.endswith(COMMENTS_SUFFIX)), None)
+    if posts_name and comments_name:
+        _pyarrow()
+        posts = pd.read_parquet(BytesIO(read(posts_name)))
+        comments = pd.read_parquet(BytesIO(read(comments_name)))
+    else:
+        name = next((name for name in names if name.endswith(".parquet")), names[0])
+        if name.endswith(".parquet"):
+            _pyarrow()
+            df = pd.read_parquet(BytesIO(read(name)))
+        else:
+            df = pd.read_csv(BytesIO(read(name)))
+        if not is_typed(df):
+            df = clean_frame(df)
+        posts, comments = split_frame(df)
+    return posts, comments.sort_values("post_id", kind="stable", ignore_index=True)
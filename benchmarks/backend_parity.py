@@ -0,0 +1,44 @@
+# ----------------------------------
+# benchmarks/backend_parity.py
+# ----------------------------------
+# Reports label agreement and maximum probability drift of the quantized and
+# ONNX backends against the fp32 PyTorch baseline on a fixture corpus, so a
+# backend can be picked per deployment from data.
+#
+#   python benchmarks/backend_parity.py
+#   python benchmarks/backend_parity.py --model /path/to/snapshot --candidates onnx
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import sentiment_model  # noqa: E402
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "parity_comments.txt")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sentiment backend accuracy parity")
+    parser.add_argument("--model", default=sentiment_model.DEFAULT_MODEL_NAME)
+    parser.add_argument("--corpus", default=FIXTURE, help="one comment per line")
+    parser.add_argument("--baseline", default="torch")
+    parser.add_argument("--candidates", nargs="+", default=["torch-int8", "onnx"], choices=sentiment_model.BACKENDS)
+    parser.add_argument("--json", help="also write the report to this path")
+    args = parser.parse_args()
+
+    with open(args.corpus, encoding="utf-8") as f:
+        texts = [sentiment_model.remove_emojis(line.rstrip("\n")).strip() for line in f]
+
+    report = sentiment_model.compare_backends(texts, model_name=args.model, baseline=args.baseline, candidates=args.candidates)
+
+    print(f"{'backend':<12} {'rows':>5} {'agreement':>10} {'max drift':>10}")
+    for backend, row in report.items():
+        print(f"{backend:<12} {row['rows']:>5} {row['label_agreement']:>10.2%} {row['max_prob_drift']:>10.4f}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
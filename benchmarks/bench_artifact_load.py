@@ -0,0 +1,121 @@
+# ----------------------------------
+# benchmarks/bench_artifact_load.py
+# ----------------------------------
+# Load time and memory of the scraper artifact as the dashboard reads it,
+# through artifact_format.read_tables:
+#   csv      the wide CSV, read, coerced and split into posts and comments
+#   parquet  the typed posts and comments tables, used as stored
+# Artifacts are synthetic (posts with 1..200 comments over a few profiles)
+# and written through the scraper's RowSink, so both hold the same rows.
+# Each load runs in a fresh interpreter; peak RSS is measured above the
+# interpreter's baseline after imports.
+#
+#   python benchmarks/bench_artifact_load.py --rows 100000 500000
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+import artifact_format  # noqa: E402
+
+PROBE = r"""
+import json, resource, sys, time
+import pandas as pd, pyarrow.parquet
+import artifact_format
+before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+t0 = time.perf_counter()
+def read(path):
+    with open(path, "rb") as f:
+        return f.read()
+posts, comments = artifact_format.read_tables(sys.argv[1:], read)
+t1 = time.perf_counter()
+after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({
+    "seconds": t1 - t0,
+    "peak_rss_mb": (after - before) / 1024,
+    "frame_mb": (posts.memory_usage(deep=True).sum() + comments.memory_usage(deep=True).sum()) / 2**20,
+    "rows": len(comments),
+}))
+"""
+
+WORDS = ["chala", "bagundi", "anna", "super", "ఇది", "చాలా", "బాగుంది", "❤️", "🔥", "nice", "worst", "జై"]
+
+
+def synthetic_rows(n_rows, seed=0):
+    rng = random.Random(seed)
+    profiles = [f"profile_{i}" for i in range(8)]
+    row = 0
+    post = 0
+    while row < n_rows:
+        post += 1
+        profile = rng.choice(profiles)
+        url = f"https://www.instagram.com/{profile}/p/C{post:09d}/"
+        for i in range(min(rng.randint(1, 200), n_rows - row)):
+            first = i == 0
+            likes = f"{rng.randint(0, 2_000_000):,}" if rng.random() > 0.05 else "Hidden"
+            yield {
+                "username": profile,
+                "Post_Number": post,
+                "URL": url,
+                "Date": f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}" if first else "",
+                "Time": f"{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:{rng.randint(0, 59):02d}" if first else "",
+                "Likes": likes if first else "",
+                "Caption": " ".join(rng.choices(WORDS, k=12)) if first else "",
+                "Hashtags": "#tollywood, #telugu" if first else "",
+                "Comments": " ".join(rng.choices(WORDS, k=rng.randint(1, 15))),
+            }
+            row += 1
+
+
+def write_artifact(base_path, n_rows):
+    from scraper import RowSink
+
+    sink = RowSink(base_path, formats=["csv", "parquet"])
+    sink.write("synthetic", synthetic_rows(n_rows))
+    sink.close()
+    return {fmt: artifact_format.artifact_paths(base_path, fmt) for fmt in sink.formats}
+
+
+def measure(paths):
+    out = subprocess.run([sys.executable, "-c", PROBE, *paths], cwd=REPO_ROOT, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Artifact load time and memory, CSV vs Parquet")
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 500_000])
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--json", help="also write the results to this path")
+    args = parser.parse_args()
+
+    results = []
+    print(f"{'rows':>9} {'format':>8} {'file MB':>8} {'load s':>8} {'peak MB':>8} {'frame MB':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_rows in args.rows:
+            for fmt, paths in write_artifact(os.path.join(tmp, f"artifact_{n_rows}"), n_rows).items():
+                runs = [measure(paths) for _ in range(args.runs)]
+                best = min(runs, key=lambda run: run["seconds"])
+                result = {
+                    "rows": best["rows"],
+                    "format": fmt,
+                    "file_mb": sum(os.path.getsize(path) for path in paths) / 2**20,
+                    "seconds": best["seconds"],
+                    "peak_rss_mb": max(run["peak_rss_mb"] for run in runs),
+                    "frame_mb": best["frame_mb"],
+                }
+                results.append(result)
+                print(f"{result['rows']:>9} {result['format']:>8} {result['file_mb']:>8.1f} {result['seconds']:>8.3f} "
+                      f"{result['peak_rss_mb']:>8.1f} {result['frame_mb']:>9.1f}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+# ----------------------------------
+# benchmarks/bench_payload_parse.py
+# ----------------------------------
+# Checks instagram_payloads.parse_payloads against the recorded capture in
+# fixtures/instagram_capture.json, then measures parse throughput on a
+# session built by cloning those payloads under fresh post and comment ids.
+#
+#   python benchmarks/bench_payload_parse.py --posts 100 1000 5000
+import argparse
+import copy
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import instagram_payloads  # noqa: E402
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "instagram_capture.json")
+
+
+def load_capture(path=FIXTURE):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def check_fixture(capture):
+    posts = instagram_payloads.parse_payloads(capture["payloads"])
+    for shortcode, expected in capture["expected"].items():
+        record = posts[shortcode]
+        actual = {
+            "taken_at": record["timestamp"].isoformat(),
+            "likes": record["likes"],
+            "caption": record["caption"],
+            "comments": len(record["comments"]),
+        }
+        if actual != expected:
+            raise AssertionError(f"{shortcode}: expected {expected}, parsed {actual}")
+    return len(posts)
+
+
+def _renumber(value, offset):
+    # Shift every numeric id and shortcode so cloned payloads are new posts.
+    if isinstance(value, dict):
+        out = {}
+        for key, child in value.items():
+            if key in ("pk", "id", "media_id") and isinstance(child, str):
+                head, _, tail = child.partition("_")
+                child = str(int(head) + offset) + (f"_{tail}" if tail else "")
+            elif key in ("code", "shortcode") and isinstance(child, str):
+                child = f"{child}{offset}"
+            out[key] = _renumber(child, offset)
+        return out
+    if isinstance(value, list):
+        return [_renumber(child, offset) for child in value]
+    return value
+
+
+def synthetic_session(capture, n_posts):
+    templates = []
+    for payload in capture["payloads"]:
+        body = payload["body"]
+        try:
+            parsed = json.loads(body.removeprefix(instagram_payloads.JSON_GUARD))
+        except ValueError:
+            continue
+        templates.append((payload["url"], parsed))
+    per_round = len(capture["expected"])
+
+    payloads = []
+    for round_index in range(max(1, n_posts // per_round)):
+        offset = (round_index + 1) * 1000
+        for url, parsed in templates:
+            # REST URLs carry the media id too; shift it along with the body.
+            url = instagram_payloads.MEDIA_ID_PATTERN.sub(lambda m: f"/media/{int(m.group(1)) + offset}/", url)
+            payloads.append({"url": url, "body": json.dumps(_renumber(copy.deepcopy(parsed), offset), ensure_ascii=False)})
+    return payloads
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Instagram payload parser check and throughput")
+    parser.add_argument("--posts", type=int, nargs="+", default=[100, 1000, 5000])
+    args = parser.parse_args()
+
+    capture = load_capture()
+    print(f"fixture OK: {check_fixture(capture)} posts parsed as expected")
+
+    print(f"{'posts':>7} {'payloads':>9} {'comments':>9} {'seconds':>9} {'posts/s':>10}")
+    for n_posts in args.posts:
+        payloads = synthetic_session(capture, n_posts)
+        started = time.perf_counter()
+        posts = instagram_payloads.parse_payloads(payloads)
+        elapsed = time.perf_counter() - started
+        comments = sum(len(record["comments"]) for record in posts.values())
+        print(f"{len(posts):>7} {len(payloads):>9} {comments:>9} {elapsed:>9.3f} {len(posts) / elapsed:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+# ----------------------------------
+# benchmarks/bench_preprocessor.py
+# ----------------------------------
+# Compares the compiled rule engine in EnhancedTeluguPreprocessor against the
+# original one-re.sub-per-rule loop as the rule tables grow, and checks that
+# both produce byte-for-byte identical output.
+#
+#   python benchmarks/bench_preprocessor.py --comments 2000 --rules 10 100 1000 5000
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+import emoji
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import sentiment_model  # noqa: E402
+
+
+def legacy_apply_rules(text, mapping):
+    for key, val in mapping.items():
+        text = re.sub(rf"\b{re.escape(key)}\b", val, text, flags=re.IGNORECASE)
+    return text
+
+
+def legacy_preprocess(pre, text):
+    if not isinstance(text, str):
+        return ""
+    text = text.strip().lower()
+    text = legacy_apply_rules(text, pre.translit_variants)
+    text = legacy_apply_rules(text, pre.negations)
+    text = legacy_apply_rules(text, pre.boosters)
+    text = pre.punctuation_pattern.sub("", text)
+    text = emoji.replace_emoji(text, replace='')
+    return text
+
+
+def synthetic_rules(n_rules, rng):
+    rules = dict(sentiment_model.rules_dict)
+    variants = dict(rules["translit_variants"])
+    canonical = sorted(set(variants.values()))
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    while len(variants) < n_rules:
+        key = "".join(rng.choice(letters) for _ in range(rng.randint(3, 9)))
+        variants.setdefault(key, rng.choice(canonical))
+    rules["translit_variants"] = variants
+    return rules
+
+
+def synthetic_comments(rules, n_comments, rng):
+    vocab = list(rules["translit_variants"]) + rules["negation_words"] + rules["booster_words"]
+    filler = ["anna", "mee", "video", "super", "ra", "bro", "😂", "🔥", "!!", "ఇది", "బాగుంది", "Not", "BUT"]
+    comments = []
+    for _ in range(n_comments):
+        words = [rng.choice(vocab if rng.random() < 0.4 else filler) for _ in range(rng.randint(1, 25))]
+        comments.append(" ".join(words))
+    comments[::50] = [None] * len(comments[::50])
+    return comments
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compiled vs legacy preprocessor rule engine")
+    parser.add_argument("--comments", type=int, default=2000)
+    parser.add_argument("--rules", type=int, nargs="+", default=[10, 100, 1000, 5000])
+    parser.add_argument("--seed", type=int, default=13)
+    args = parser.parse_args()
+
+    print(f"{'rules':>7} {'legacy s':>10} {'compiled s':>11} {'series s':>10} {'speedup':>8}  mode")
+    for n_rules in args.rules:
+        rng = random.Random(args.seed)
+        rules = synthetic_rules(n_rules, rng)
+        comments = synthetic_comments(rules, args.comments, rng)
+        pre = sentiment_model.EnhancedTeluguPreprocessor(rules)
+
+        legacy, t_legacy = timed(lambda: [legacy_preprocess(pre, c) for c in comments])
+        compiled, t_compiled = timed(lambda: [pre.preprocess(c) for c in comments])
+        series, t_series = timed(lambda: pre.preprocess_series(pd.Series(comments, dtype=object)).tolist())
+
+        if legacy != compiled or legacy != series:
+            raise SystemExit(f"Output mismatch with {n_rules} rules")
+        mode = "single-pass" if all(table.single_pass or not table.rules for table in pre.rule_tables) else "sequential"
+        print(f"{n_rules:>7} {t_legacy:>10.3f} {t_compiled:>11.3f} {t_series:>10.3f} {t_legacy / t_compiled:>7.1f}x  {mode}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+# ----------------------------------
+# benchmarks/bench_scraper_replay.py
+# ----------------------------------
+# Offline, deterministic scraper benchmark: runs scrape_instagram against a
+# recording of WebDriver traffic (see scraper_replay) with simulated
+# per-command latency, and reports throughput and WebDriver round trips per
+# post. Every replay's output is compared with the recorded run's, so a
+# change that alters what the scraper extracts shows up as a mismatch, and
+# one that adds round trips shows up in the counts.
+#
+# Without --recording, a synthetic profile (synthetic_instagram.py) is
+# recorded first. With one, pass the profile and dates it was recorded with.
+#
+#   python benchmarks/bench_scraper_replay.py --latency-ms 0 5 20
+#   python benchmarks/bench_scraper_replay.py --mode grid --workers 3
+#   python benchmarks/bench_scraper_replay.py --recording recording/ --profile https://www.instagram.com/x/ \
+#       --start 2025-03-01 --end 2025-03-31
+import argparse
+import contextlib
+import hashlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import scraper  # noqa: E402
+import scraper_replay  # noqa: E402
+from synthetic_instagram import SyntheticProfile, synthetic_driver_factory  # noqa: E402
+
+# No deliberate pauses: the benchmark measures the scraper, not the policy.
+NO_DELAYS = {"navigate": (0.0, 0.0), "post": (0.0, 0.0), "load_more": (0.0, 0.0)}
+
+
+def run_scrape(driver_factory, args, workdir):
+    """One scrape_instagram run in workdir; (seconds, output digest, pool)."""
+    pacer = scraper.Pacer(NO_DELAYS, timeout=args.wait_timeout, poll=0.01)
+    pool = scraper.DriverPool(size=args.workers, driver_factory=driver_factory, pacer=pacer)
+    previous = os.getcwd()
+    os.makedirs(workdir, exist_ok=True)
+    os.chdir(workdir)  # the journal and any screenshots land here
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            pool.warm_up()
+            sink = scraper.RowSink("out", formats=["csv"])
+            started = time.perf_counter()
+            scraper.scrape_instagram(args.profile, args.start, args.end, pool=pool, mode=args.mode, sink=sink)
+            elapsed = time.perf_counter() - started
+            sink.close()
+            pool.close()
+        digest = None
+        if os.path.exists("out.csv"):
+            with open("out.csv", "rb") as f:
+                digest = hashlib.sha1(f.read()).hexdigest()
+    finally:
+        os.chdir(previous)
+    return elapsed, digest, pool, sink.rows_written
+
+
+def record_synthetic(args, directory):
+    profile = SyntheticProfile(posts=args.posts, max_comments=args.max_comments, seed=args.seed)
+    args.profile = args.profile or profile.url
+    make_driver = synthetic_driver_factory(profile)
+
+    def recorded_driver(extraction=None):
+        driver = make_driver(extraction)
+        scraper_replay.record(driver, directory, snapshots=False)
+        return driver
+
+    return run_scrape(recorded_driver, args, os.path.join(directory, "run"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scraper throughput and round trips, replayed offline")
+    parser.add_argument("--recording", help="directory of session_*.jsonl files; default: record a synthetic profile")
+    parser.add_argument("--profile", default=None)
+    parser.add_argument("--start", default="2025-03-10")
+    parser.add_argument("--end", default="2025-03-31")
+    parser.add_argument("--mode", default="serial", choices=["serial", "grid"])
+    parser.add_argument("--workers", type=int, default=1, help="browsers in the pool (grid mode fetches in parallel)")
+    parser.add_argument("--posts", type=int, default=30, help="synthetic profile size")
+    parser.add_argument("--max-comments", type=int, default=120)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--latency-ms", type=float, nargs="+", default=[0, 5, 20])
+    parser.add_argument("--wait-timeout", type=float, default=1.0)
+    parser.add_argument("--json", help="also write the results to this path")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        reference = None
+        if args.recording is None:
+            args.recording = os.path.join(tmp, "recording")
+            _, reference, pool, rows = record_synthetic(args, args.recording)
+            print(f"recorded synthetic profile: {len(pool.post_round_trips)} posts, {rows} rows -> {args.recording}")
+        elif args.profile is None:
+            parser.error("--profile is required with --recording")
+        library = scraper_replay.ReplayLibrary(args.recording)
+
+        results = []
+        print(f"{'latency ms':>10} {'posts':>6} {'rows':>6} {'seconds':>8} {'posts/s':>8} {'rt/post':>8} {'rt p95':>7} "
+              f"{'misses':>7} {'output':>8}")
+        for latency_ms in args.latency_ms:
+            drivers = []
+
+            def replay_driver(extraction=None):
+                driver = library.driver(latency=latency_ms / 1000)
+                drivers.append(driver)
+                return driver
+
+            elapsed, digest, pool, rows = run_scrape(replay_driver, args, os.path.join(tmp, f"replay_{latency_ms:g}"))
+            reference = reference or digest
+            trips = pool.round_trip_summary()
+            posts = trips.get("posts", 0)
+            result = {
+                "latency_ms": latency_ms,
+                "posts": posts,
+                "rows": rows,
+                "seconds": elapsed,
+                "posts_per_second": posts / elapsed if elapsed else 0.0,
+                "round_trips_mean": trips.get("mean", 0),
+                "round_trips_p95": trips.get("p95", 0),
+                "misses": sum(driver.stats["misses"] for driver in drivers),
+                "output_matches": digest == reference,
+            }
+            results.append(result)
+            print(f"{latency_ms:>10g} {posts:>6} {rows:>6} {elapsed:>8.3f} {result['posts_per_second']:>8.1f} "
+                  f"{result['round_trips_mean']:>8} {result['round_trips_p95']:>7} {result['misses']:>7} "
+                  f"{'same' if result['output_matches'] else 'CHANGED':>8}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
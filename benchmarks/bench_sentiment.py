@@ -0,0 +1,124 @@
+# ----------------------------------
+# benchmarks/bench_sentiment.py
+# ----------------------------------
+# Throughput benchmark for sentiment_model on synthetic code-mixed corpora.
+# For each corpus size it times three stages separately:
+#   preprocess   EnhancedTeluguPreprocessor.preprocess, per comment
+#   tokenize     the MuRIL tokenizer on prepared text, per chunk
+#   inference    MuRILSentiment.score_processed on prepared text, per chunk
+# and reports comments/sec, p50/p95 latency and peak RSS. Results are saved as
+# JSON (tagged with the git commit) so runs can be diffed between commits.
+#
+#   python benchmarks/bench_sentiment.py --tiny --sizes 1000 5000
+#   python benchmarks/bench_sentiment.py --model /models/muril --backend onnx --out muril_onnx.json
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, REPO_ROOT)
+
+import sentiment_model  # noqa: E402
+from synthetic_corpus import generate_corpus  # noqa: E402
+from tiny_model import build_tiny_model  # noqa: E402
+
+
+def peak_rss_mb():
+    # ru_maxrss is the process high-water mark: KiB on Linux, bytes on macOS.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)] if ordered else 0.0
+
+
+def run_stage(items, fn, chunk_size):
+    latencies = []
+    started = time.perf_counter()
+    for start in range(0, len(items), chunk_size):
+        chunk = items[start:start + chunk_size]
+        t0 = time.perf_counter()
+        fn(chunk)
+        latencies.append((time.perf_counter() - t0) * 1000)
+    elapsed = time.perf_counter() - started
+    return {
+        "comments_per_sec": len(items) / elapsed if elapsed else 0.0,
+        "seconds": elapsed,
+        "chunk_size": chunk_size,
+        "p50_ms": percentile(latencies, 0.5),
+        "p95_ms": percentile(latencies, 0.95),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="sentiment_model throughput benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 5000, 20000])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--model", default=sentiment_model.DEFAULT_MODEL_NAME)
+    parser.add_argument("--tiny", action="store_true", help="use a tiny random model instead of --model (offline)")
+    parser.add_argument("--backend", default="torch", choices=sentiment_model.BACKENDS)
+    parser.add_argument("--chunk-size", type=int, default=256, help="comments per timed inference/tokenize call")
+    parser.add_argument("--out", default=os.path.join(BENCH_DIR, "results", "sentiment.json"))
+    args = parser.parse_args()
+
+    model_name = args.model
+    if args.tiny:
+        tiny_dir = tempfile.TemporaryDirectory(prefix="tiny_muril_")  # removed when the script exits
+        model_name = build_tiny_model(tiny_dir.name)
+
+    t0 = time.perf_counter()
+    model = sentiment_model.MuRILSentiment(model_name=model_name, backend=args.backend)
+    load_seconds = time.perf_counter() - t0
+    preprocessor = model.preprocessor
+
+    results = {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpus": sentiment_model.cpu_count(),
+        "model": "tiny-random" if args.tiny else args.model,
+        "backend": args.backend,
+        "seed": args.seed,
+        "model_load_seconds": load_seconds,
+        "sizes": {},
+    }
+
+    print(f"{'size':>7} {'stage':<11} {'comments/s':>11} {'p50 ms':>8} {'p95 ms':>8} {'peak MB':>8}")
+    for size in args.sizes:
+        corpus = [sentiment_model.remove_emojis(text).strip() for text in generate_corpus(size, seed=args.seed)]
+        prepared = model.prepare_batch(corpus)
+        stages = {
+            "preprocess": run_stage(corpus, lambda chunk: [preprocessor.preprocess(text) for text in chunk], 1),
+            "tokenize": run_stage(prepared, lambda chunk: model.tokenizer(chunk, truncation=True), args.chunk_size),
+            "inference": run_stage(prepared, model.score_processed, args.chunk_size),
+        }
+        results["sizes"][str(size)] = stages
+        for stage, row in stages.items():
+            print(f"{size:>7} {stage:<11} {row['comments_per_sec']:>11,.0f} {row['p50_ms']:>8.2f} {row['p95_ms']:>8.2f} {row['peak_rss_mb']:>8.0f}")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"\n✅ Results saved to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+# ----------------------------------
+# benchmarks/bench_sentiment_server.py
+# ----------------------------------
+# Load test for sentiment_server.py on one machine: starts the server on a free
+# localhost port, fires concurrent clients at it and reports throughput,
+# request latency and the server's micro-batching metrics.
+#
+#   python benchmarks/bench_sentiment_server.py --clients 8 --requests 20 --texts 16
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import sentiment_model  # noqa: E402
+import sentiment_server  # noqa: E402
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "parity_comments.txt")
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)] if ordered else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sentiment server load test")
+    parser.add_argument("--model", default=sentiment_model.DEFAULT_MODEL_NAME)
+    parser.add_argument("--backend", default=None, choices=sentiment_model.BACKENDS)
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=20, help="requests per client")
+    parser.add_argument("--texts", type=int, default=16, help="texts per request")
+    parser.add_argument("--max-batch-size", type=int, default=64)
+    parser.add_argument("--max-wait-ms", type=float, default=10)
+    args = parser.parse_args()
+
+    with open(FIXTURE, encoding="utf-8") as f:
+        corpus = [line.rstrip("\n") for line in f]
+
+    server = sentiment_server.serve("127.0.0.1", 0, args.model, args.backend,
+                                    max_batch_size=args.max_batch_size, max_wait_ms=args.max_wait_ms)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    latencies = []
+    lock = threading.Lock()
+
+    def run_client(seed):
+        rng = random.Random(seed)
+        client = sentiment_server.SentimentClient(url)
+        for _ in range(args.requests):
+            texts = client.prepare_batch([rng.choice(corpus) for _ in range(args.texts)])
+            started = time.perf_counter()
+            client.score_processed(texts)
+            with lock:
+                latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=run_client, args=(seed,)) for seed in range(args.clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    total_texts = args.clients * args.requests * args.texts
+    print(f"texts/sec          {total_texts / elapsed:,.1f}")
+    print(f"request p50 (ms)   {percentile(latencies, 0.5) * 1000:.1f}")
+    print(f"request p95 (ms)   {percentile(latencies, 0.95) * 1000:.1f}")
+    print(json.dumps(sentiment_server.SentimentClient(url).metrics(), indent=2))
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+# ----------------------------------
+# benchmarks/bench_startup.py
+# ----------------------------------
+# Cold-start timings for sentiment_model, each run in a fresh interpreter:
+#   module_import    import sentiment_model (should not pull in torch)
+#   heavy_import     import torch + transformers
+#   model_load       MuRILSentiment(...) construction
+#   first_inference  first predict_batch call
+#
+#   python benchmarks/bench_startup.py --runs 5
+#   SENTIMENT_MODEL_DIR=/models/muril python benchmarks/bench_startup.py --json startup.json
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = r"""
+import json, sys, time
+t0 = time.perf_counter()
+import sentiment_model
+t1 = time.perf_counter()
+heavy_before = "torch" in sys.modules
+import torch, transformers
+t2 = time.perf_counter()
+model = sentiment_model.MuRILSentiment(model_name=sys.argv[1], backend=sys.argv[2])
+t3 = time.perf_counter()
+model.predict_batch(["chala bagundi anna", "ఇది చాలా బాగుంది"])
+t4 = time.perf_counter()
+print(json.dumps({
+    "module_import": t1 - t0,
+    "heavy_import": t2 - t1,
+    "model_load": t3 - t2,
+    "first_inference": t4 - t3,
+    "torch_imported_by_module": heavy_before,
+}))
+"""
+
+STAGES = ("module_import", "heavy_import", "model_load", "first_inference")
+
+
+def main():
+    sys.path.insert(0, REPO_ROOT)
+    import sentiment_model
+
+    parser = argparse.ArgumentParser(description="sentiment_model cold-start benchmark")
+    parser.add_argument("--model", default=sentiment_model.DEFAULT_MODEL_NAME)
+    parser.add_argument("--backend", default="torch", choices=sentiment_model.BACKENDS)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--json", help="also write the results to this path")
+    args = parser.parse_args()
+
+    runs = []
+    for _ in range(args.runs):
+        out = subprocess.run(
+            [sys.executable, "-c", PROBE, args.model, args.backend],
+            cwd=REPO_ROOT, capture_output=True, text=True, check=True,
+        )
+        runs.append(json.loads(out.stdout.strip().splitlines()[-1]))
+
+    summary = {stage: statistics.median(run[stage] for run in runs) for stage in STAGES}
+    summary["torch_imported_by_module"] = any(run["torch_imported_by_module"] for run in runs)
+    for stage in STAGES:
+        print(f"{stage:<16} {summary[stage] * 1000:>9.1f} ms (median of {len(runs)})")
+    if summary["torch_imported_by_module"]:
+        print("⚠️ importing sentiment_model pulled in torch")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"summary": summary, "runs": runs}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
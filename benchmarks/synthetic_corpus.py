@@ -0,0 +1,68 @@
+# ----------------------------------
+# benchmarks/synthetic_corpus.py
+# ----------------------------------
+# Reproducible synthetic comment corpora for benchmarks: a mix of Telugu
+# script, romanized Telugu and English comments with a long-tailed length
+# distribution, emojis, user tags and repeated spam, drawn from the
+# rules_dict vocabularies.
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sentiment_model import rules_dict  # noqa: E402
+
+TELUGU_WORDS = [
+    "చాలా", "బాగుంది", "మంచి", "చెత్త", "నాయకుడు", "ప్రభుత్వం", "పని", "ఇది", "అన్న", "గారు",
+    "జై", "నిర్ణయం", "ప్రజలు", "అభివృద్ధి", "ఓటు", "పార్టీ", "కాదు", "లేదు", "సూపర్", "ధన్యవాదాలు",
+]
+ENGLISH_WORDS = [
+    "good", "great", "work", "sir", "people", "government", "policy", "vote", "thanks", "support",
+    "bad", "worst", "nice", "speech", "development", "roads", "village", "why", "the", "is", "this",
+]
+EMOJIS = ["🔥", "👏", "🙏", "❤️", "😂", "😡", "👍", "👎", "😢", "💪", "🎉", "🤔"]
+SPAM = ["follow me 🔥", "check my profile", "nice 👍", "🔥🔥🔥", "super anna"]
+
+DEFAULT_MIX = {"telugu": 0.3, "romanized": 0.5, "english": 0.2}
+
+
+def romanized_vocab(rules=rules_dict):
+    words = set(rules["telugu_stop_words"]) | set(rules["negation_words"]) | set(rules["booster_words"])
+    for group in rules["sentiment_words"].values():
+        words |= set(group)
+    words |= set(rules["translit_variants"]) | set(rules["abbreviations"]) | set(rules["code_switch_markers"])
+    return sorted(words)
+
+
+def _length(rng):
+    # Most comments are a few words; a long tail runs to a paragraph.
+    return max(1, min(int(rng.lognormvariate(1.6, 0.8)), 120))
+
+
+def generate_corpus(n, seed=0, mix=None, emoji_rate=0.35, spam_rate=0.05, empty_rate=0.02):
+    """Return n synthetic comments; the same (n, seed, mix) always gives the same list."""
+    rng = random.Random(seed)
+    mix = mix or DEFAULT_MIX
+    vocabularies = {"telugu": TELUGU_WORDS, "romanized": romanized_vocab(), "english": ENGLISH_WORDS}
+    kinds, weights = zip(*mix.items())
+
+    comments = []
+    for _ in range(n):
+        roll = rng.random()
+        if roll < empty_rate:
+            comments.append("")
+            continue
+        if roll < empty_rate + spam_rate:
+            comments.append(rng.choice(SPAM))
+            continue
+
+        kind = rng.choices(kinds, weights)[0]
+        words = [rng.choice(vocabularies[kind]) for _ in range(_length(rng))]
+        if kind != "english" and rng.random() < 0.3:  # code-mixing
+            words.insert(rng.randrange(len(words) + 1), rng.choice(ENGLISH_WORDS))
+        if rng.random() < 0.1:
+            words.insert(0, f"@user{rng.randrange(1000)}")
+        if rng.random() < emoji_rate:
+            words.append("".join(rng.choice(EMOJIS) for _ in range(rng.randint(1, 4))))
+        comments.append(" ".join(words))
+    return comments
@@ -0,0 +1,176 @@
+# ----------------------------------
+# benchmarks/synthetic_instagram.py
+# ----------------------------------
+# A stand-in for chromedriver driving Instagram: a WebDriver command executor
+# that answers the scraper's commands (the profile grid, the post modal and
+# its "next" button, the page scripts in scraper.py) for a generated
+# profile. Used to make a recording offline when no real one is at hand;
+# the replay benchmark then runs the scraper against that recording.
+import random
+from datetime import datetime, timedelta, timezone
+
+import scraper
+
+ELEMENT_KEY = "element-6066-11e4-a52e-4f735466cecf"
+WORDS = ["chala", "bagundi", "anna", "super", "ఇది", "చాలా", "బాగుంది", "❤️", "🔥", "nice", "worst", "జై"]
+FIRST_BATCH = 12
+PAGE_SIZE = 15
+GRID_PAGE = 12
+
+
+class SyntheticProfile:
+    """Posts for one profile, newest first, one per day back from `newest`."""
+
+    def __init__(self, username="synthetic_profile", posts=30, max_comments=120, newest=datetime(2025, 3, 31, 12, tzinfo=timezone.utc),
+                 seed=0):
+        rng = random.Random(seed)
+        self.username = username
+        self.url = f"https://www.instagram.com/{username}/"
+        self.posts = []
+        for index in range(posts):
+            taken_at = newest - timedelta(days=index, minutes=rng.randint(0, 600))
+            self.posts.append({
+                "url": f"https://www.instagram.com/p/S{seed}x{index:05d}/",
+                "datetime": taken_at.strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+                "likes": f"{rng.randint(0, 250000):,}" if rng.random() > 0.1 else None,
+                "caption": " ".join(rng.choices(WORDS, k=8)) + " #tollywood #telugu",
+                "comments": [" ".join(rng.choices(WORDS, k=rng.randint(1, 10))) for _ in range(rng.randint(0, max_comments))],
+            })
+        self.by_url = {post["url"]: index for index, post in enumerate(self.posts)}
+
+
+def _element(element_id):
+    return {ELEMENT_KEY: element_id}
+
+
+class SyntheticExecutor:
+    """Executor for one browser session on a SyntheticProfile."""
+
+    def __init__(self, profile):
+        self.profile = profile
+        self.url = "about:blank"
+        self.post = None
+        self.grid_visible = GRID_PAGE
+        self.loaded = {}  # post index -> comments in the page
+        self.served = {}  # post index -> comments already returned (tagged read)
+
+    def execute(self, command, params):
+        handler = getattr(self, f"_{command}", None)
+        value = handler(params or {}) if handler else None
+        if isinstance(value, dict) and value.get("error"):
+            return {"status": value["error"], "value": {"error": value["error"], "message": value["error"], "stacktrace": ""}}
+        return {"value": value}
+
+    def close(self):
+        pass
+
+    # Navigation
+    def _newSession(self, params):
+        return {"sessionId": "synthetic", "capabilities": {"browserName": "chrome"}}
+
+    def _get(self, params):
+        self._open(params["url"])
+
+    def _getCurrentUrl(self, params):
+        return self.url
+
+    def _open(self, url):
+        self.url = url
+        self.post = self.profile.by_url.get(url)
+        if self.post is not None:
+            self.loaded[self.post] = min(FIRST_BATCH, len(self.profile.posts[self.post]["comments"]))
+            self.served[self.post] = 0
+
+    # Elements
+    def _findElement(self, params):
+        value = params.get("value", "")
+        if value.endswith("/section/main/div/div/div[2]/div/div/div/div/div[1]/div[1]/a") and self.url == self.profile.url:
+            return _element("first-post")
+        if "_abl-" in value and self.post is not None and self.post + 1 < len(self.profile.posts):
+            return _element("next-post")
+        return {"error": "no such element"}
+
+    def _findElements(self, params):
+        return []
+
+    def _isElementEnabled(self, params):
+        return True
+
+    def _screenshot(self, params):
+        return ""
+
+    # Scripts
+    def _w3cExecuteScript(self, params):
+        script, args = params["script"], params.get("args", [])
+        if script == "return document.readyState":
+            return "complete"
+        if script == "return performance.getEntriesByType('resource').length":
+            return 42
+        if script == "return 1":
+            return 1
+        if script.startswith("/* isDisplayed */"):
+            return True
+        if script == "arguments[0].click();":
+            target = args[0].get(ELEMENT_KEY)
+            if target == "first-post":
+                self._open(self.profile.posts[0]["url"])
+            elif target == "next-post":
+                self._open(self.profile.posts[self.post + 1]["url"])
+            return None
+        if script == scraper.EXTRACT_POST_SCRIPT:
+            return self._extract_post()
+        if script == scraper.POST_TIME_SCRIPT:
+            return self.profile.posts[self.post]["datetime"] if self.post is not None else None
+        if script == scraper.GRID_LINKS_SCRIPT:
+            if self.url != self.profile.url:
+                return {"urls": [], "height": 0}
+            return {"urls": [post["url"] for post in self.profile.posts[:self.grid_visible]], "height": self.grid_visible * 100}
+        if script == "window.scrollTo(0, document.body.scrollHeight);":
+            self.grid_visible = min(self.grid_visible + GRID_PAGE, len(self.profile.posts))
+            return None
+        if script == "return document.body.scrollHeight;":
+            return self.grid_visible * 100
+        return None
+
+    def _w3cExecuteScriptAsync(self, params):
+        if params["script"] == scraper.READ_NEW_COMMENTS_SCRIPT:
+            _, _, click_more, _ = params["args"]
+            return self._read_comments(click_more)
+        return None
+
+    def _extract_post(self):
+        if self.post is None:
+            return None
+        post = self.profile.posts[self.post]
+        texts = self._unread()
+        return {
+            "url": post["url"],
+            "datetime": post["datetime"],
+            "likes": post["likes"],
+            "caption": post["caption"],
+            "comments": texts,
+            "has_more": self._has_more(),
+            "container": _element(f"comments-{self.post}"),
+        }
+
+    def _unread(self):
+        comments = self.profile.posts[self.post]["comments"]
+        texts = comments[self.served[self.post]:self.loaded[self.post]]
+        self.served[self.post] = self.loaded[self.post]
+        return texts
+
+    def _has_more(self):
+        return self.loaded[self.post] < len(self.profile.posts[self.post]["comments"])
+
+    def _read_comments(self, click_more):
+        if click_more and self._has_more():
+            self.loaded[self.post] = min(self.loaded[self.post] + PAGE_SIZE, len(self.profile.posts[self.post]["comments"]))
+        return {"texts": self._unread(), "has_more": self._has_more(), "timed_out": False}
+
+
+def synthetic_driver_factory(profile):
+    """A DriverPool driver_factory whose browsers browse `profile`."""
+    from scraper_replay import ReplayDriver
+
+    # ReplayDriver is a plain WebDriver over any executor.
+    return lambda extraction=None: ReplayDriver(SyntheticExecutor(profile))
@@ -0,0 +1,35 @@
+# ----------------------------------
+# benchmarks/tiny_model.py
+# ----------------------------------
+# Builds a tiny, randomly initialised BERT sequence classifier with a
+# WordPiece vocabulary covering the synthetic corpus, saved in the same layout
+# as a hub snapshot. Lets benchmarks exercise the full MuRILSentiment path
+# offline without the real weights; its predictions are meaningless.
+import os
+
+from synthetic_corpus import EMOJIS, ENGLISH_WORDS, TELUGU_WORDS, romanized_vocab
+
+SPECIAL_TOKENS = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"]
+
+
+def build_tiny_model(target_dir, hidden_size=64, layers=2, heads=2, seed=0):
+    import torch
+    from transformers import BertConfig, BertForSequenceClassification, BertTokenizerFast
+
+    os.makedirs(target_dir, exist_ok=True)
+    words = set(ENGLISH_WORDS) | set(romanized_vocab()) | set(TELUGU_WORDS)
+    chars = sorted({char for word in words | set(EMOJIS) for char in word})
+    vocab = SPECIAL_TOKENS + sorted(words) + chars + [f"##{char}" for char in chars]
+    vocab_path = os.path.join(target_dir, "vocab.txt")
+    with open(vocab_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(dict.fromkeys(vocab)))
+
+    tokenizer = BertTokenizerFast(vocab_path)
+    torch.manual_seed(seed)
+    config = BertConfig(
+        vocab_size=len(tokenizer), hidden_size=hidden_size, num_hidden_layers=layers,
+        num_attention_heads=heads, intermediate_size=hidden_size * 4, num_labels=3,
+    )
+    BertForSequenceClassification(config).save_pretrained(target_dir)
+    tokenizer.save_pretrained(target_dir)
+    return target_dir
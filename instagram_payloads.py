@@ -0,0 +1,192 @@
+# ----------------------------------
+# instagram_payloads.py
+# ----------------------------------
+# Parses the JSON that Instagram's web client downloads for posts and
+# comments (REST api/v1 responses and GraphQL "xdt_api__v1__..." responses)
+# into structured post records. Everything here is pure: the scraper captures
+# payloads from Chrome's network log, and benchmarks/fixtures feed recorded
+# payloads through the same functions offline.
+#
+# A payload is {"url": <request url>, "body": <JSON text or parsed object>}.
+import json
+import re
+from datetime import datetime, timezone
+
+SHORTCODE_PATTERN = re.compile(r"/(?:p|reel|tv)/([A-Za-z0-9_-]+)")
+MEDIA_ID_PATTERN = re.compile(r"/media/(\d+)(?:_\d+)?/")
+# Responses worth keeping from the network log; everything else (static
+# assets, logging pings, images) is dropped before bodies are fetched.
+PAYLOAD_URL_PATTERN = re.compile(r"/(graphql/query|api/graphql|api/v1/(media|feed)/)")
+# Some endpoints prefix their JSON with an anti-hijacking guard.
+JSON_GUARD = "for (;;);"
+
+
+def is_payload_url(url):
+    return bool(url) and bool(PAYLOAD_URL_PATTERN.search(url))
+
+
+def shortcode_from_url(url):
+    match = SHORTCODE_PATTERN.search(url or "")
+    return match.group(1) if match else None
+
+
+def _media_id(node):
+    # "pk" is the numeric media id; "id" is "<pk>_<owner id>" on REST items.
+    value = node.get("pk") or node.get("id")
+    return str(value).split("_")[0] if value is not None else None
+
+
+def _timestamp(node):
+    value = node.get("taken_at") or node.get("taken_at_timestamp") or node.get("created_at")
+    if value is None:
+        return None
+    return datetime.fromtimestamp(int(value), tz=timezone.utc)
+
+
+def _likes(node):
+    if node.get("like_and_view_counts_disabled"):
+        return None
+    if "like_count" in node:
+        return node["like_count"]
+    for key in ("edge_media_preview_like", "edge_liked_by"):
+        if isinstance(node.get(key), dict) and "count" in node[key]:
+            return node[key]["count"]
+    return None
+
+
+def _caption(node):
+    caption = node.get("caption")
+    if isinstance(caption, dict):
+        return caption.get("text") or ""
+    if isinstance(caption, str):
+        return caption
+    edges = (node.get("edge_media_to_caption") or {}).get("edges") or []
+    return edges[0]["node"].get("text", "") if edges else ""
+
+
+def _is_media(node):
+    return ("code" in node or "shortcode" in node) and ("taken_at" in node or "taken_at_timestamp" in node)
+
+
+def _is_comment(node):
+    return "text" in node and "created_at" in node and ("pk" in node or "id" in node) and not _is_media(node)
+
+
+def _walk(value, media=None):
+    """Yield (kind, node, enclosing media node) for every media/comment dict."""
+    if isinstance(value, dict):
+        if _is_media(value):
+            yield "media", value, value
+            media = value
+        elif _is_comment(value):
+            yield "comment", value, media
+        for key, child in value.items():
+            # REST captions look exactly like comments; they are read by _caption.
+            if key != "caption":
+                yield from _walk(child, media)
+    elif isinstance(value, list):
+        for child in value:
+            yield from _walk(child, media)
+
+
+def _comment(node):
+    created = node.get("created_at")
+    return {
+        "id": str(node.get("pk") or node.get("id")),
+        "text": node.get("text") or "",
+        "username": (node.get("user") or node.get("owner") or {}).get("username"),
+        "created_at": datetime.fromtimestamp(int(created), tz=timezone.utc) if created else None,
+    }
+
+
+def _extend_comments(record, comments):
+    seen = {comment["id"] for comment in record["comments"]}
+    for comment in comments:
+        if comment["id"] not in seen:
+            seen.add(comment["id"])
+            record["comments"].append(comment)
+
+
+def _parse(payloads):
+    posts = {}
+    comments_by_media = {}
+    for payload in payloads:
+        body = payload.get("body")
+        if isinstance(body, bytes):
+            body = body.decode("utf-8", "replace")
+        if isinstance(body, str):
+            try:
+                body = json.loads(body.removeprefix(JSON_GUARD))
+            except ValueError:
+                continue
+        url_match = MEDIA_ID_PATTERN.search(payload.get("url") or "")
+        url_media_id = url_match.group(1) if url_match else None
+
+        for kind, node, media in _walk(body):
+            if kind == "media":
+                shortcode = node.get("code") or node.get("shortcode")
+                record = posts.setdefault(shortcode, {"shortcode": shortcode, "comments": []})
+                record.update({
+                    "media_id": _media_id(node),
+                    "timestamp": _timestamp(node),
+                    "likes": _likes(node),
+                    "caption": _caption(node),
+                })
+            else:
+                if node.get("media_id"):
+                    media_id = str(node["media_id"])
+                elif url_media_id:
+                    media_id = url_media_id
+                else:
+                    media_id = _media_id(media) if media is not None else None
+                comments_by_media.setdefault(media_id, []).append(_comment(node))
+    return posts, comments_by_media
+
+
+def parse_payloads(payloads):
+    """Turn captured payloads into {shortcode: post record}.
+
+    Records carry shortcode, media_id, timestamp (UTC datetime or None),
+    likes (int, or None when hidden), caption and comments, a list of
+    {"id", "text", "username", "created_at"} in the order they were served.
+    Comments are joined to posts by media id, taken from the comment itself,
+    the request URL, or the post they are nested under.
+    """
+    posts, comments_by_media = _parse(payloads)
+    by_media_id = {record["media_id"]: record for record in posts.values()}
+    for media_id, comments in comments_by_media.items():
+        if media_id in by_media_id:
+            _extend_comments(by_media_id[media_id], comments)
+    return posts
+
+
+class PayloadStore:
+    """Accumulates records across several captures of one browsing session.
+
+    Comment pages are often captured before or after the payload describing
+    their post, so comments for unknown media ids wait in pending_comments
+    until the post shows up.
+    """
+
+    def __init__(self):
+        self.posts = {}
+        self.pending_comments = {}
+        self.payloads_seen = 0
+
+    def add(self, payloads):
+        payloads = list(payloads)
+        self.payloads_seen += len(payloads)
+        posts, comments_by_media = _parse(payloads)
+        for shortcode, record in posts.items():
+            current = self.posts.setdefault(shortcode, {"shortcode": shortcode, "comments": []})
+            current.update({key: value for key, value in record.items() if key != "comments"})
+        for media_id, comments in comments_by_media.items():
+            self.pending_comments.setdefault(media_id, []).extend(comments)
+
+        by_media_id = {record["media_id"]: record for record in self.posts.values()}
+        for media_id in list(self.pending_comments):
+            if media_id in by_media_id:
+                _extend_comments(by_media_id[media_id], self.pending_comments.pop(media_id))
+
+    def post(self, shortcode):
+        return self.posts.get(shortcode)
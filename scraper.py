@@ -1,27 +1,321 @@
 import os
 import time
+import base64
 import random
 import pandas as pd
 import sys
-from datetime import datetime
+import sqlite3
+from datetime import datetime, timedelta
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 # import undetected_chromedriver as uc
-from selenium.common.exceptions import NoSuchElementException, TimeoutException
-from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import NoSuchElementException, StaleElementReferenceException, TimeoutException, WebDriverException
 from selenium.webdriver.support import expected_conditions as EC
 import json
+import queue
+import threading
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import artifact_format
+import scraper_replay
+from instagram_payloads import PayloadStore, is_payload_url, shortcode_from_url
 
 sys.stdout.reconfigure(encoding='utf-8')
 
-def scrape_instagram(profile_url, start_date, end_date, username=None):
-    # Generate output filename dynamically
-    start_str = datetime.strptime(start_date, "%Y-%m-%d").strftime("%m-%d")
-    end_str = datetime.strptime(end_date, "%Y-%m-%d").strftime("%m-%d")
-    insta_user = profile_url.strip("/").split("/")[-1]
-    output_file = f"{start_str}_{end_str}_{insta_user}.csv"
+# "dom" reads posts through XPaths; "network" parses the JSON the page
+# downloads (captured from Chrome's DevTools network log) and only falls
+# back to the DOM for posts whose payload was not seen.
+SCRAPER_EXTRACTION = os.environ.get("SCRAPER_EXTRACTION", "dom")
+LOAD_MORE_COMMENTS_XPATH = "//button[.//*[local-name()='svg' and @aria-label='Load more comments']]"
+COMMENT_SPAN_XPATH = './div[position()>=0]/ul/div/li/div/div/div[2]/div[1]/span'
+LIKES_XPATH = '//section[2]/div/div/span/a/span/span'
+# The post modal is mounted under body/div[4] or body/div[5] depending on
+# what else the page has open; (comments container, caption) per layout.
+POST_LAYOUTS = [
+    ('/html/body/div[4]/div[1]/div/div[3]/div/div/div/div/div[2]/div/article/div/div[2]/div/div/div[2]/div[1]/ul/div[3]/div/div',
+     '/html/body/div[4]/div[1]/div/div[3]/div/div/div/div/div[2]/div/article/div/div[2]/div/div/div[2]/div[1]/ul/div[1]/li/div/div/div[2]/div[1]/h1'),
+    ('/html/body/div[5]/div[1]/div/div[3]/div/div/div/div/div[2]/div/article/div/div[2]/div/div/div[2]/div[1]/ul/div[3]/div/div',
+     '/html/body/div[5]/div[1]/div/div[3]/div/div/div/div/div[2]/div/article/div/div[2]/div/div/div[2]/div[1]/ul/div[1]/li/div/div/div[2]/div[1]/h1'),
+    # A post opened on its own page (grid mode) rather than in the modal.
+    ('//main//article/div/div[2]/div/div/div[2]/div[1]/ul/div[3]/div/div',
+     '//main//article/div/div[2]/div/div/div[2]/div[1]/ul/div[1]/li/div/div/div[2]/div[1]/h1'),
+]
+# Comment spans that have already been returned are tagged data-ig-read, so
+# each paging round hands back only the new ones.
+SCRAPER_MAX_COMMENTS = int(os.environ.get("SCRAPER_MAX_COMMENTS", "5000"))
+SCRAPER_POST_SECONDS = float(os.environ.get("SCRAPER_POST_SECONDS", "300"))
+# Async: optionally clicks "load more", waits (MutationObserver, bounded by
+# timeoutMs) for new comment spans, tags them read and returns their texts.
+READ_NEW_COMMENTS_SCRIPT = """
+const [container, commentXPath, clickMore, timeoutMs] = arguments;
+const done = arguments[arguments.length - 1];
+const button = () => document.evaluate(
+    './li/div/button', container, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+const unread = () => document.evaluate(
+    commentXPath + '[not(@data-ig-read)]', container, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+const collect = (timedOut) => {
+    const nodes = unread();
+    const texts = [];
+    for (let i = 0; i < nodes.snapshotLength; i++) {
+        const node = nodes.snapshotItem(i);
+        node.setAttribute('data-ig-read', '1');
+        texts.push(node.innerText.trim());
+    }
+    return {texts: texts, has_more: !!button(), timed_out: timedOut};
+};
+const more = clickMore && button();
+if (!more) { done(collect(false)); return; }
+
+let finished = false, settle = null;
+const finish = (timedOut) => {
+    if (finished) return;
+    finished = true;
+    observer.disconnect();
+    clearTimeout(deadline);
+    clearTimeout(settle);
+    done(collect(timedOut));
+};
+// Comments arrive as a burst of mutations; answer once they pause.
+const observer = new MutationObserver(() => {
+    clearTimeout(settle);
+    settle = setTimeout(() => { if (unread().snapshotLength) finish(false); }, 150);
+});
+observer.observe(container, {childList: true, subtree: true});
+const deadline = setTimeout(() => finish(true), timeoutMs);
+more.click();
+"""
+# "serial" opens the first post and clicks "next"; "grid" harvests the
+# profile grid first and opens in-range posts on several browsers at once.
+SCRAPER_MODE = os.environ.get("SCRAPER_MODE", "serial")
+SCRAPER_POST_WORKERS = int(os.environ.get("SCRAPER_POST_WORKERS", "3"))
+SCRAPER_MAX_GRID_POSTS = int(os.environ.get("SCRAPER_MAX_GRID_POSTS", "2000"))
+GRID_LINKS_SCRIPT = """
+const urls = [];
+for (const link of document.querySelectorAll('main a[href*="/p/"], main a[href*="/reel/"]')) {
+    urls.push(new URL(link.getAttribute('href'), location.href).href);
+}
+return {urls: urls, height: document.body.scrollHeight};
+"""
+POST_TIME_SCRIPT = "const time = document.querySelector('time'); return time && time.getAttribute('datetime');"
+# Reads everything the element-by-element path reads, in one round trip.
+# Returns null until the post's <time> is in the page; "container" is null
+# when no layout matched, and is returned as a WebElement for paging.
+EXTRACT_POST_SCRIPT = """
+const [layouts, likesXPath, commentXPath] = arguments;
+const first = (xpath, context) => document.evaluate(
+    xpath, context || document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+const time = first('//time');
+if (!time) return null;
+let container = null, caption = null;
+for (const [containerXPath, captionXPath] of layouts) {
+    container = first(containerXPath);
+    caption = container && first(captionXPath);
+    if (container && caption) break;
+    container = null;
+}
+const comments = [];
+if (container) {
+    const nodes = document.evaluate(commentXPath, container, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+    for (let i = 0; i < nodes.snapshotLength; i++) {
+        const node = nodes.snapshotItem(i);
+        node.setAttribute('data-ig-read', '1');
+        comments.push(node.innerText.trim());
+    }
+}
+const likes = first(likesXPath);
+return {
+    url: location.href,
+    datetime: time.getAttribute('datetime'),
+    likes: likes ? likes.innerText : null,
+    caption: caption ? caption.innerText.trim() : null,
+    comments: comments,
+    has_more: !!(container && first('./li/div/button', container)),
+    container: container,
+};
+"""
+
+
+# ------------------------
+# Pacing
+# ------------------------
+# Waits are on readiness conditions with a bounded timeout. Deliberate
+# human-like pauses come from a rate policy: (min, max) seconds per kind of
+# action. "cautious" matches the fixed sleeps the scraper used to have and
+# stays the default; deployments opt into "polite" or "fast" with SCRAPER_PACE.
+RATE_POLICIES = {
+    "fast": {"navigate": (0.0, 0.3), "post": (0.2, 0.6), "load_more": (0.0, 0.2)},
+    "polite": {"navigate": (0.5, 1.5), "post": (1.0, 2.5), "load_more": (0.3, 0.8)},
+    "cautious": {"navigate": (5.0, 5.0), "post": (3.0, 5.0), "load_more": (2.0, 2.0)},
+}
+SCRAPER_PACE = os.environ.get("SCRAPER_PACE", "cautious")
+SCRAPER_WAIT_TIMEOUT = float(os.environ.get("SCRAPER_WAIT_TIMEOUT", "10"))
+# Where to write the recorded wait/delay timings at the end of a CLI run.
+SCRAPER_TIMINGS_PATH = os.environ.get("SCRAPER_TIMINGS_PATH", "")
+
+
+class Pacer:
+    """Readiness waits and policy delays, with the time each one really took.
+
+    Every wait and delay is recorded under a name, so summary() shows where a
+    run spends its idle time and how often waits hit their timeout.
+    """
+
+    def __init__(self, policy=SCRAPER_PACE, timeout=SCRAPER_WAIT_TIMEOUT, poll=0.1):
+        self.policy = RATE_POLICIES[policy] if isinstance(policy, str) else policy
+        self.timeout = timeout
+        self.poll = poll
+        self._lock = threading.Lock()
+        self.timings = defaultdict(list)
+        self.timeouts = Counter()
+
+    def record(self, name, seconds, timed_out=False):
+        with self._lock:
+            self.timings[name].append(seconds)
+            if timed_out:
+                self.timeouts[name] += 1
+
+    def until(self, name, condition, timeout=None):
+        """Poll condition() until it returns something truthy; None on timeout."""
+        timeout = self.timeout if timeout is None else timeout
+        started = time.perf_counter()
+        while True:
+            try:
+                value = condition()
+            except (NoSuchElementException, StaleElementReferenceException):
+                value = None
+            if value:
+                self.record(name, time.perf_counter() - started)
+                return value
+            if time.perf_counter() - started >= timeout:
+                self.record(name, time.perf_counter() - started, timed_out=True)
+                return None
+            time.sleep(self.poll)
+
+    def element(self, driver, name, locator, timeout=None, clickable=False):
+        """Like WebDriverWait(...).until(EC...): the element, or TimeoutException."""
+        condition = EC.element_to_be_clickable(locator) if clickable else EC.presence_of_element_located(locator)
+        element = self.until(name, lambda: condition(driver), timeout)
+        if element is None:
+            raise TimeoutException(f"{name}: {locator[1]} not ready")
+        return element
+
+    def document_ready(self, driver, name, timeout=None):
+        return self.until(name, lambda: driver.execute_script("return document.readyState") == "complete", timeout)
+
+    def network_idle(self, driver, name, idle=0.5, timeout=None):
+        """Wait until no new resource requests have started for `idle` seconds."""
+        state = {"count": -1, "since": time.perf_counter()}
+
+        def settled():
+            count = driver.execute_script("return performance.getEntriesByType('resource').length")
+            now = time.perf_counter()
+            if count != state["count"]:
+                state.update(count=count, since=now)
+            return now - state["since"] >= idle
+
+        return self.until(name, settled, timeout)
+
+    def delay(self, kind):
+        low, high = self.policy[kind]
+        seconds = random.uniform(low, high)
+        if seconds > 0:
+            time.sleep(seconds)
+        self.record(f"delay:{kind}", seconds)
+
+    def summary(self):
+        with self._lock:
+            timings = {name: sorted(values) for name, values in self.timings.items()}
+            timeouts = dict(self.timeouts)
+        return {
+            name: {
+                "count": len(values),
+                "total_seconds": round(sum(values), 3),
+                "p50_seconds": round(values[len(values) // 2], 3),
+                "p95_seconds": round(values[min(int(0.95 * len(values)), len(values) - 1)], 3),
+                "max_seconds": round(values[-1], 3),
+                "timeouts": timeouts.get(name, 0),
+            }
+            for name, values in timings.items()
+        }
+
+
+# ------------------------
+# Network capture (CDP)
+# ------------------------
+class NetworkCapture:
+    """Collects Instagram's post/comment JSON responses from the performance log.
+
+    Needs the "goog:loggingPrefs" performance capability on the driver.
+    Bodies are fetched with Network.getResponseBody once loading finishes and
+    parsed into self.store (see instagram_payloads).
+    """
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.store = PayloadStore()
+        self._pending = {}  # requestId -> url, response seen but body not loaded yet
+        driver.execute_cdp_cmd("Network.enable", {})
+
+    def drain(self):
+        payloads = []
+        for entry in self.driver.get_log("performance"):
+            try:
+                message = json.loads(entry["message"])["message"]
+            except (KeyError, ValueError):
+                continue
+            params = message.get("params", {})
+            if message.get("method") == "Network.responseReceived":
+                url = params.get("response", {}).get("url")
+                if is_payload_url(url):
+                    self._pending[params["requestId"]] = url
+            elif message.get("method") == "Network.loadingFinished" and params.get("requestId") in self._pending:
+                url = self._pending.pop(params["requestId"])
+                try:
+                    response = self.driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": params["requestId"]})
+                except WebDriverException:
+                    continue  # evicted from Chrome's buffer
+                body = response.get("body", "")
+                if response.get("base64Encoded"):
+                    body = base64.b64decode(body).decode("utf-8", "replace")
+                payloads.append({"url": url, "body": body})
+        self.store.add(payloads)
+        return payloads
+
+
+def collect_network_comments(driver, capture, record, pacer, max_rounds=200):
+    """Caption plus comment texts for a post, paging comments in via "load more"."""
+    for _ in range(max_rounds):
+        buttons = driver.find_elements(By.XPATH, LOAD_MORE_COMMENTS_XPATH)
+        if not buttons:
+            break
+        loaded = len(record["comments"])
+        driver.execute_script("arguments[0].click();", buttons[0])
+
+        def more_loaded():
+            capture.drain()
+            return len(record["comments"]) > loaded
+
+        if pacer.until("comments_payload", more_loaded) is None:
+            break
+        pacer.delay("load_more")
+    return [record["caption"].strip()] + [comment["text"].strip() for comment in record["comments"]]
+# ------------------------
+# Browser Setup
+# ------------------------
+SCRAPER_BROWSERS = int(os.environ.get("SCRAPER_BROWSERS", "5"))
+# Chrome's memory creeps up over a long session; a browser is replaced once
+# it has served this many posts.
+SCRAPER_RECYCLE_POSTS = int(os.environ.get("SCRAPER_RECYCLE_POSTS", "300"))
+# A profile walk gives up after this many failed posts in a row.
+SCRAPER_MAX_POST_ERRORS = int(os.environ.get("SCRAPER_MAX_POST_ERRORS", "3"))
+# When set, every browser's WebDriver traffic is recorded here for offline
+# replay (see scraper_replay).
+SCRAPER_RECORD_DIR = os.environ.get("SCRAPER_RECORD_DIR", "")
+
+
+def build_chrome_options(extraction=SCRAPER_EXTRACTION):
 
     # Chrome options
     chrome_options = Options()
@@ -31,7 +325,7 @@ def scrape_instagram(profile_url, start_date, end_date, username=None):
     chrome_options.add_argument("--headless=new")
     chrome_options.add_argument("--disable-gpu")
     chrome_options.add_argument("--window-size=1920,1080")
-    
+
     # ------------------------
     # PERFORMANCE OPTIMIZATIONS
     # ------------------------
@@ -58,238 +352,1166 @@ def scrape_instagram(profile_url, start_date, end_date, username=None):
         "profile.default_content_setting_values.cookies": 1,
         "profile.block_third_party_cookies": True,
     })
+    if extraction == "network":
+        chrome_options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    return chrome_options
 
-    # Initialize Chrome driver
+
+def create_driver(extraction=SCRAPER_EXTRACTION):
     service = Service()  # Add path if chromedriver not in PATH
-    driver = webdriver.Chrome(service=service, options=chrome_options)
-    # driver = uc.Chrome(options=chrome_options)
-    wait = WebDriverWait(driver, 10)
+    driver = webdriver.Chrome(service=service, options=build_chrome_options(extraction))
+    # driver = uc.Chrome(options=build_chrome_options(extraction))
+    # Async page scripts wait up to SCRAPER_WAIT_TIMEOUT themselves.
+    driver.set_script_timeout(SCRAPER_WAIT_TIMEOUT + 30)
+    if SCRAPER_RECORD_DIR:
+        scraper_replay.record(driver, SCRAPER_RECORD_DIR)
+    return driver
+
 
+def login_with_cookies(driver, pacer):
     # Open Instagram main page
     driver.get("https://www.instagram.com/")
     print("🔄 Opening Instagram...")
-    time.sleep(5)
+    pacer.document_ready(driver, "homepage")
 
     # ------------------------
     # Login via hardcoded cookies
     # ------------------------
-    try:
-        cookies = [
-            {"name": "csrftoken", "value": "Rf5IkDkC5ToB7WLxwBJXqBsEhhtacnYH", "domain": ".instagram.com", "path": "/"},
-            {"name": "datr",      "value": "BYzwaMODPk1FrOWDRvKdP-MI", "domain": ".instagram.com", "path": "/"},
-            {"name": "dpr",       "value": "1.25", "domain": ".instagram.com", "path": "/"},
-            {"name": "ds_user_id","value": "72782729777", "domain": ".instagram.com", "path": "/"},
-            {"name": "ig_did",    "value": "356B55F2-C173-46CA-BF6B-B6A34260D7AD", "domain": ".instagram.com", "path": "/"},
-            {"name": "mid",       "value": "aPCMBQALAAEuhO8RpUZ7vfEg8cCZ", "domain": ".instagram.com", "path": "/"},
-            {"name": "rur",       "value": "CCO\\05472782729777\\0541792582265:01fed7f09310a7dd37f9fec22286bbc198afe6145f400200f80c6c0eb422bfcb5d3356d9", "domain": ".instagram.com", "path": "/"},
-            {"name": "sessionid", "value": "72782729777%3AXy000Mrq0Qnon7%3A3%3AAYgxnnMw8vAY39iGTTPeI3eoN9hZkwUZ4HKEP3my2A", "domain": ".instagram.com", "path": "/"},
-            {"name": "wd",        "value": "679x730", "domain": ".instagram.com", "path": "/"},
-        ]
-
-        for cookie in cookies:
-            driver.add_cookie(cookie)
-
-        driver.refresh()
-        time.sleep(5)
-        print("✅ Logged in via hardcoded cookies, no CAPTCHA!")
-    except Exception as e:
-        print(f"⚠️ Error loading cookies: {e}")
-        driver.quit()
-        return
+    cookies = [
+        {"name": "csrftoken", "value": "Rf5IkDkC5ToB7WLxwBJXqBsEhhtacnYH", "domain": ".instagram.com", "path": "/"},
+        {"name": "datr",      "value": "BYzwaMODPk1FrOWDRvKdP-MI", "domain": ".instagram.com", "path": "/"},
+        {"name": "dpr",       "value": "1.25", "domain": ".instagram.com", "path": "/"},
+        {"name": "ds_user_id","value": "72782729777", "domain": ".instagram.com", "path": "/"},
+        {"name": "ig_did",    "value": "356B55F2-C173-46CA-BF6B-B6A34260D7AD", "domain": ".instagram.com", "path": "/"},
+        {"name": "mid",       "value": "aPCMBQALAAEuhO8RpUZ7vfEg8cCZ", "domain": ".instagram.com", "path": "/"},
+        {"name": "rur",       "value": "CCO\\05472782729777\\0541792582265:01fed7f09310a7dd37f9fec22286bbc198afe6145f400200f80c6c0eb422bfcb5d3356d9", "domain": ".instagram.com", "path": "/"},
+        {"name": "sessionid", "value": "72782729777%3AXy000Mrq0Qnon7%3A3%3AAYgxnnMw8vAY39iGTTPeI3eoN9hZkwUZ4HKEP3my2A", "domain": ".instagram.com", "path": "/"},
+        {"name": "wd",        "value": "679x730", "domain": ".instagram.com", "path": "/"},
+    ]
 
-    # Navigate to profile
-    time.sleep(5)
+    for cookie in cookies:
+        driver.add_cookie(cookie)
+
+    driver.refresh()
+    pacer.document_ready(driver, "login_refresh")
+    pacer.network_idle(driver, "login_idle")
+    print("✅ Logged in via hardcoded cookies, no CAPTCHA!")
+
+
+class PooledBrowser:
+    def __init__(self, driver, extraction):
+        self.extraction = extraction
+        # Every chromedriver command (WebElement ones included) goes through
+        # driver.execute, so counting there counts HTTP round trips.
+        self.round_trips = 0
+        self.attach(driver)
+
+    def attach(self, driver):
+        """Start using a new (logged-in) session; the round trip count carries on."""
+        self.driver = driver
+        self.capture = NetworkCapture(driver) if self.extraction == "network" else None
+        self.posts = 0
+        self.created_at = time.time()
+        execute = driver.execute
+
+        def counted_execute(command, params=None):
+            self.round_trips += 1
+            return execute(command, params)
+
+        driver.execute = counted_execute
+
+    def healthy(self):
+        try:
+            self.driver.execute_script("return 1")
+            return True
+        except WebDriverException:
+            return False
+
+    def quit(self):
+        try:
+            self.driver.quit()
+        except WebDriverException:
+            pass
+
+
+class DriverPool:
+    """Logged-in Chrome sessions shared by profile jobs.
+
+    Browsers are launched and logged in once, then handed out with acquire()
+    and returned with release(). A browser that has crashed is replaced when
+    it is next handed out, and one that has served recycle_after_posts posts
+    is quit and replaced on release. Long profiles call renew() between
+    posts, so the same holds within one profile. driver_factory(extraction)
+    makes the drivers (create_driver, or a scraper_replay factory offline).
+    """
+
+    def __init__(self, size=SCRAPER_BROWSERS, extraction=SCRAPER_EXTRACTION, recycle_after_posts=SCRAPER_RECYCLE_POSTS,
+                 pacer=None, driver_factory=None):
+        self.size = size
+        self.pacer = pacer or Pacer()
+        self.extraction = extraction
+        self.driver_factory = driver_factory or create_driver
+        self.recycle_after_posts = recycle_after_posts
+        self._idle = queue.Queue()
+        self._lock = threading.Lock()
+        self._launched = 0
+        self._browsers = set()
+        self.stats = Counter()
+        self.post_round_trips = []
+
+    def _new_driver(self):
+        driver = self.driver_factory(self.extraction)
+        try:
+            login_with_cookies(driver, self.pacer)
+        except Exception:
+            driver.quit()
+            raise
+        return driver
+
+    def _launch(self):
+        started = time.perf_counter()
+        browser = PooledBrowser(self._new_driver(), self.extraction)
+        with self._lock:
+            self._browsers.add(browser)
+            self.stats["launched"] += 1
+            self.stats["setup_seconds"] += time.perf_counter() - started
+        return browser
+
+    def _discard(self, browser):
+        browser.quit()
+        with self._lock:
+            self._browsers.discard(browser)
+            self._launched -= 1
+
+    def warm_up(self, count=None):
+        """Launch and log in `count` browsers (default: all of them) up front, in parallel."""
+        with self._lock:
+            missing = max(0, min(self.size, count or self.size) - self._launched)
+            self._launched += missing
+        with ThreadPoolExecutor(max(1, missing)) as executor:
+            futures = [executor.submit(self._launch) for _ in range(missing)]
+        for future in futures:
+            try:
+                self._idle.put(future.result())
+            except Exception as e:
+                print(f"⚠️ Browser failed to start: {e}")
+                with self._lock:
+                    self._launched -= 1
+
+    def acquire(self):
+        while True:
+            try:
+                browser = self._idle.get_nowait()
+                if browser is None:
+                    continue
+            except queue.Empty:
+                with self._lock:
+                    can_launch = self._launched < self.size
+                    if can_launch:
+                        self._launched += 1
+                if can_launch:
+                    try:
+                        return self._launch()
+                    except Exception:
+                        with self._lock:
+                            self._launched -= 1
+                        raise
+                browser = self._idle.get()
+                if browser is None:
+                    continue  # a slot was freed by a recycled browser
+
+            if browser.healthy():
+                self.stats["reused"] += 1
+                return browser
+            print("⚠️ Browser crashed, replacing it")
+            self.stats["replaced"] += 1
+            self._discard(browser)
+
+    def try_acquire(self):
+        """An idle or newly launched browser, or None if the pool is at capacity."""
+        try:
+            browser = self._idle.get_nowait()
+        except queue.Empty:
+            browser = None
+        if browser is not None:
+            if browser.healthy():
+                self.stats["reused"] += 1
+                return browser
+            self.stats["replaced"] += 1
+            self._discard(browser)
+        with self._lock:
+            if self._launched >= self.size:
+                return None
+            self._launched += 1
+        try:
+            return self._launch()
+        except Exception as e:
+            print(f"⚠️ Browser failed to start: {e}")
+            with self._lock:
+                self._launched -= 1
+            return None
+
+    def renew(self, browser, failed=False):
+        """Between posts: give a worn-out browser, or one that has crashed, a fresh session.
+
+        Worn out means it has served recycle_after_posts posts; after a
+        failed post (failed=True) it is also checked for a crash. The session
+        is swapped inside `browser`, so whoever holds it keeps it. Returns
+        True when it was swapped, in which case the page state is gone.
+        """
+        if browser.posts >= self.recycle_after_posts:
+            reason = "recycled"
+            print(f"♻️ Browser served {browser.posts} posts, replacing it")
+        elif failed and not browser.healthy():
+            reason = "replaced"
+            print("⚠️ Browser crashed mid-profile, replacing it")
+        else:
+            return False
+        started = time.perf_counter()
+        browser.quit()
+        browser.attach(self._new_driver())
+        with self._lock:
+            self.stats[reason] += 1
+            self.stats["launched"] += 1
+            self.stats["setup_seconds"] += time.perf_counter() - started
+        return True
+
+    def release(self, browser):
+        if browser.capture is not None:
+            browser.capture.drain()
+            browser.capture.store = PayloadStore()
+        if browser.posts >= self.recycle_after_posts:
+            self.stats["recycled"] += 1
+            self._discard(browser)
+            self._idle.put(None)  # wake a waiting acquire() so it launches a replacement
+            return
+        self._idle.put(browser)
+
+    def round_trip_summary(self):
+        values = sorted(self.post_round_trips)
+        if not values:
+            return {}
+        return {
+            "posts": len(values),
+            "mean": round(sum(values) / len(values), 1),
+            "p95": values[min(int(0.95 * len(values)), len(values) - 1)],
+            "max": values[-1],
+        }
+
+    def close(self):
+        with self._lock:
+            browsers = list(self._browsers)
+            self._browsers.clear()
+            self._launched = 0
+        for browser in browsers:
+            browser.quit()
+
+
+# ------------------------
+# Incremental State
+# ------------------------
+# Per profile: the newest in-range post collected, the date range the stored
+# dataset covers, and how many comments each post already has. Re-runs whose
+# range is covered only open posts newer than SCRAPER_RECENT_DAYS before the
+# watermark, take just the new comments of posts they already have, and
+# merge with the profile's previous rows.
+SCRAPER_STATE_DIR = os.environ.get("SCRAPER_STATE_DIR", "scraper_state")
+SCRAPER_RECENT_DAYS = int(os.environ.get("SCRAPER_RECENT_DAYS", "7"))
+
+
+class WatermarkStore:
+    def __init__(self, state_dir=SCRAPER_STATE_DIR):
+        self.state_dir = state_dir
+        os.makedirs(os.path.join(state_dir, "datasets"), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(os.path.join(state_dir, "watermarks.sqlite"), timeout=30, check_same_thread=False)
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS profiles ("
+                "profile TEXT PRIMARY KEY, newest_url TEXT, newest_timestamp REAL, covered_from TEXT, updated_at REAL, "
+                "covered_to TEXT)"
+            )
+            columns = [row[1] for row in self._conn.execute("PRAGMA table_info(profiles)")]
+            if "covered_to" not in columns:
+                # Older stores tracked only covered_from; their coverage counts as unknown.
+                self._conn.execute("ALTER TABLE profiles ADD COLUMN covered_to TEXT")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS posts ("
+                "profile TEXT, url TEXT, timestamp REAL, comments INTEGER, PRIMARY KEY (profile, url))"
+            )
+
+    def watermark(self, profile):
+        """(newest post url, its timestamp, first date covered, last date covered) or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT newest_url, newest_timestamp, covered_from, covered_to FROM profiles WHERE profile = ?", (profile,)
+            ).fetchone()
+        if row is None or row[1] is None:
+            return None
+        return row[0], datetime.fromtimestamp(row[1]), row[2], row[3]
+
+    def comment_counts(self, profile, since):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT url, comments FROM posts WHERE profile = ? AND timestamp >= ? AND comments IS NOT NULL",
+                (profile, since.timestamp()),
+            ).fetchall()
+        return dict(rows)
+
+    def record_post(self, profile, url, timestamp, comments=None):
+        """Remember a post; comments=None keeps the count already stored."""
+        if timestamp is None:
+            return
+        timestamp = timestamp.replace(tzinfo=None).timestamp()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO posts VALUES (?, ?, ?, ?) ON CONFLICT(profile, url) DO UPDATE SET "
+                "timestamp = excluded.timestamp, comments = COALESCE(excluded.comments, posts.comments)",
+                (profile, url, timestamp, comments),
+            )
+            self._conn.execute(
+                "INSERT INTO profiles (profile, newest_url, newest_timestamp, updated_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(profile) DO UPDATE SET newest_url = excluded.newest_url, "
+                "newest_timestamp = excluded.newest_timestamp, updated_at = excluded.updated_at "
+                "WHERE profiles.newest_timestamp IS NULL OR excluded.newest_timestamp > profiles.newest_timestamp",
+                (profile, url, timestamp, time.time()),
+            )
+
+    def mark_covered(self, profile, start_date, end_date):
+        """Record that the dataset holds every post from start_date to end_date.
+
+        Coverage is one date range: a run that overlaps or adjoins it extends
+        it, and one that does not replaces it.
+        """
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT covered_from, covered_to FROM profiles WHERE profile = ?", (profile,)
+            ).fetchone()
+            if row is not None and row[0] and row[1]:
+                day = timedelta(days=1)
+                if (datetime.strptime(start_date, "%Y-%m-%d") <= datetime.strptime(row[1], "%Y-%m-%d") + day
+                        and datetime.strptime(end_date, "%Y-%m-%d") >= datetime.strptime(row[0], "%Y-%m-%d") - day):
+                    start_date, end_date = min(start_date, row[0]), max(end_date, row[1])
+            self._conn.execute(
+                "INSERT INTO profiles (profile, covered_from, covered_to, updated_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(profile) DO UPDATE SET covered_from = excluded.covered_from, "
+                "covered_to = excluded.covered_to, updated_at = excluded.updated_at",
+                (profile, start_date, end_date, time.time()),
+            )
+
+    def _dataset_path(self, profile):
+        return os.path.join(self.state_dir, "datasets", f"{profile}.csv")
+
+    def load_dataset(self, profile):
+        path = self._dataset_path(profile)
+        if not os.path.exists(path):
+            return pd.DataFrame()
+        return pd.read_csv(path, dtype=str, keep_default_na=False, encoding="utf-8-sig")
+
+    def save_dataset(self, profile, df):
+        path = self._dataset_path(profile)
+        df.to_csv(path + ".tmp", index=False, encoding="utf-8-sig")
+        os.replace(path + ".tmp", path)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+# ------------------------
+# Checkpoint Journal
+# ------------------------
+class ScrapeJournal:
+    """Append-only JSONL checkpoint of finished posts for one profile run.
+
+    Each finished post is one line (post number, URL, date fields and its
+    rows), flushed and fsynced before the scraper moves on, so a crash loses
+    at most the post in progress. resume=True keeps what an earlier run
+    wrote; otherwise the journal starts empty.
+    """
+
+    def __init__(self, path, resume=False):
+        self.path = path
+        self.posts = {}
+        self.done = False
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        if resume and os.path.exists(path):
+            good = 0
+            with open(path, "rb") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        break  # torn last line from a crash
+                    good += len(line)
+                    if entry.get("done"):
+                        self.done = True
+                    else:
+                        self.posts[entry["url"]] = entry
+            # Drop the torn tail so new lines start on a clean line.
+            with open(path, "r+b") as f:
+                f.truncate(good)
+        self._file = open(path, "a" if resume else "w", encoding="utf-8")
+
+    @property
+    def last_url(self):
+        return max(self.posts.values(), key=lambda entry: entry["post_number"])["url"] if self.posts else None
+
+    def completed(self, url):
+        """The journaled post as read_post returns it, or None."""
+        entry = self.posts.get(url)
+        if entry is None:
+            return None
+        post = {key: entry[key] for key in ("url", "date", "time", "likes")}
+        post["datetime"] = datetime.fromisoformat(entry["datetime"]) if entry["datetime"] else None
+        post["texts"] = []
+        return post
+
+    def _write(self, entry):
+        with self._lock:
+            self._file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def record(self, number, post, rows):
+        entry = {
+            "post_number": number,
+            "url": post["url"],
+            "datetime": post["datetime"].isoformat() if post["datetime"] else None,
+            "date": post["date"],
+            "time": post["time"],
+            "likes": post["likes"],
+            "in_range": bool(post["texts"]),
+            "rows": rows,
+        }
+        self._write(entry)
+        with self._lock:
+            self.posts[post["url"]] = entry
+
+    def finish(self):
+        self._write({"done": True})
+        self.done = True
+
+    def rows(self):
+        with self._lock:
+            entries = sorted(self.posts.values(), key=lambda entry: entry["post_number"])
+        return [row for entry in entries for row in entry["rows"]]
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+# ------------------------
+# Output
+# ------------------------
+OUTPUT_COLUMNS = artifact_format.COLUMNS
+SCRAPER_SINK_BUFFER = int(os.environ.get("SCRAPER_SINK_BUFFER", "5000"))
+# csv: the wide layout, for compatibility; parquet: the typed posts and
+# comments tables the dashboard prefers.
+SCRAPER_OUTPUT_FORMATS = [fmt.strip() for fmt in os.environ.get("SCRAPER_OUTPUT_FORMATS", "csv,parquet").split(",") if fmt.strip()]
+
+
+class RowSink:
+    """The artifact files of every format, shared by every profile worker and written as rows arrive.
+
+    scrape_instagram writes each post's rows as the post finishes. At most
+    max_buffered rows are held before they are written out (one Parquet row
+    group per table per flush; the rest go out in close()), and the rows of
+    one write() call go in together under the lock, so a post's rows stay
+    contiguous. Files are only created by the first flush.
+    """
+
+    def __init__(self, base_path, formats=SCRAPER_OUTPUT_FORMATS, max_buffered=SCRAPER_SINK_BUFFER):
+        unknown = set(formats) - set(artifact_format.FORMATS)
+        if unknown:
+            raise ValueError(f"Unknown output formats: {sorted(unknown)}")
+        self.base_path = base_path
+        self.formats = list(formats)
+        self.paths = [path for fmt in self.formats for path in artifact_format.artifact_paths(base_path, fmt)]
+        self.max_buffered = max_buffered
+        self.rows_written = 0
+        self.profiles = Counter()
+        self._buffer = []
+        self._writers = None
+        self._lock = threading.Lock()
+
+    def _flush(self):
+        if not self._buffer:
+            return
+        if self._writers is None:
+            self._writers = [artifact_format.open_appender(self.base_path, fmt) for fmt in self.formats]
+        for writer in self._writers:
+            writer.write(self._buffer)
+        self.rows_written += len(self._buffer)
+        self._buffer.clear()
+
+    def write(self, profile, rows):
+        """Append rows (an iterable of dicts) of one profile."""
+        with self._lock:
+            for row in rows:
+                self._buffer.append(row)
+                self.profiles[profile] += 1
+                if len(self._buffer) >= self.max_buffered:
+                    self._flush()
+
+    def write_frame(self, profile, df):
+        self.write(profile, (dict(zip(df.columns, values)) for values in df.itertuples(index=False, name=None)))
+
+    def close(self):
+        with self._lock:
+            self._flush()
+            for writer in self._writers or []:
+                writer.close()
+
+
+def merge_datasets(previous, new, replace=False):
+    """Previous rows plus new ones, new posts first; Post_Number is renumbered.
+
+    New comments on a post already in `previous` go after its earlier rows.
+    With replace=True (a --full run) posts in `new` replace their old rows.
+    """
+    if previous.empty:
+        return new
+    if new.empty:
+        return previous
+    new = new.astype({"Post_Number": str})
+    if replace:
+        previous = previous[~previous["URL"].isin(new["URL"])]
+    seen = new["URL"].isin(previous["URL"])
+    merged = pd.concat([new[~seen], previous, new[seen]], ignore_index=True)
+    order = {url: number for number, url in enumerate(pd.unique(merged["URL"]), 1)}
+    merged["Post_Number"] = merged["URL"].map(order)
+    return merged.sort_values("Post_Number", kind="stable").reset_index(drop=True)
+
+
+def rows_in_window(df, start_date, end_date):
+    """Rows of posts dated start_date..end_date (the date sits on each post's first row)."""
+    if df.empty:
+        return df
+    dates = pd.to_datetime(df["Date"].replace("", None), errors="coerce").groupby(df["URL"]).transform("first")
+    return df[(dates >= pd.Timestamp(start_date)) & (dates <= pd.Timestamp(end_date))].reset_index(drop=True)
+
+
+def scrape_instagram(profile_url, start_date, end_date, username=None, extraction=SCRAPER_EXTRACTION, pool=None,
+                     mode=SCRAPER_MODE, state=None, full=False, resume=False, sink=None):
+    # With a sink, each new post's rows go into the shared output file as the
+    # post finishes; posts already in the stored dataset follow at the end,
+    # with any new comments after their stored rows.
+    # Generate output filename dynamically
+    start_str = datetime.strptime(start_date, "%Y-%m-%d").strftime("%m-%d")
+    end_str = datetime.strptime(end_date, "%Y-%m-%d").strftime("%m-%d")
+    insta_user = profile_url.strip("/").split("/")[-1]
+    output_file = f"{start_str}_{end_str}_{insta_user}.csv"
+
+    journal = ScrapeJournal(
+        os.path.join(SCRAPER_STATE_DIR, "journal", f"{insta_user}_{start_date}_{end_date}.jsonl"), resume=resume)
+    if journal.posts:
+        print(f"⏯ Resuming {insta_user}: {len(journal.posts)} posts already done, last {journal.last_url}")
+
+    own_pool = pool is None
+    if own_pool:
+        pool = DriverPool(size=SCRAPER_POST_WORKERS if mode == "grid" else 1, extraction=extraction)
+
+    # Incremental run: only posts from the recent window before the watermark
+    # on, and only comments past the counts already collected.
+    known, scrape_from = {}, start_date
+    mark = state.watermark(insta_user) if state is not None and not full else None
+    if mark is not None:
+        newest_url, newest_dt, covered_from, covered_to = mark
+        floor = newest_dt - timedelta(days=SCRAPER_RECENT_DAYS)
+        recent_from = max(start_date, floor.strftime("%Y-%m-%d"))
+        # Posts before recent_from are skipped, so they must all be in the
+        # stored dataset already.
+        if covered_from and covered_to and covered_from <= start_date and covered_to >= recent_from:
+            scrape_from = recent_from
+        # Every stored post the run will open, from the start of its first day.
+        known = state.comment_counts(insta_user, since=datetime.strptime(scrape_from, "%Y-%m-%d"))
+        print(f"🔖 {insta_user}: watermark {newest_dt:%Y-%m-%d}, scraping from {scrape_from}, {len(known)} recent posts known")
+
+    previous = state.load_dataset(insta_user) if state is not None else pd.DataFrame()
+    stored = set() if full or previous.empty else set(previous["URL"])
+    streamed = {}  # url -> Post_Number of the posts already in the sink
+
+    def stream(number, url, rows):
+        if sink is None or url in stored or not rows:
+            return
+        sink.write(insta_user, rows)
+        streamed[url] = number
+
+    def on_post(number, post, rows):
+        journal.record(number, post, rows)
+        stream(number, post["url"], rows)
+
+    for entry in sorted(journal.posts.values(), key=lambda entry: entry["post_number"]):
+        stream(entry["post_number"], entry["url"], entry["rows"])  # finished by the interrupted run
+
+    # A journal marked done belongs to a run whose rows are already merged
+    # into the stored dataset; merging them again would duplicate them.
+    merged_before = journal.done
+    if not journal.done:
+        try:
+            browser = pool.acquire()
+        except Exception as e:
+            print(f"⚠️ Error loading cookies: {e}")
+            journal.close()
+            return
+        try:
+            scrape_posts(browser, profile_url, scrape_from, end_date, pool.pacer, pool, mode, known, on_post,
+                         completed=journal.completed)
+        finally:
+            pool.release(browser)
+            if own_pool:
+                pool.close()
+
+    # The stored dataset is built from the journal, so resumed posts are included.
+    df = pd.DataFrame(journal.rows())
+    if state is not None and merged_before:
+        df = rows_in_window(previous, start_date, end_date)
+    elif state is not None:
+        merged = merge_datasets(previous, df, replace=full)
+        state.save_dataset(insta_user, merged)
+        # Watermarks move only once the rows they vouch for are saved, and
+        # only from posts in the range: a newer post that was skipped must not
+        # count as collected.
+        for entry in journal.posts.values():
+            if not entry["in_range"]:
+                continue
+            timestamp = datetime.fromisoformat(entry["datetime"]) if entry["datetime"] else None
+            state.record_post(insta_user, entry["url"], timestamp, known.get(entry["url"], 0) + len(entry["rows"]))
+        state.mark_covered(insta_user, scrape_from, end_date)
+        df = rows_in_window(merged, start_date, end_date)
+    # Done only once the rows are saved, so a crash before that re-merges them on --resume.
+    if not journal.done:
+        journal.finish()
+    journal.close()
+
+    # Save to CSV
+    if sink is not None:
+        rest = df[~df["URL"].isin(list(streamed))] if not df.empty else df
+        if not rest.empty:
+            # Numbered on from the streamed posts, in dataset order.
+            rest = rest.assign(Post_Number=pd.factorize(rest["URL"])[0] + 1 + max(streamed.values(), default=0))
+            sink.write_frame(insta_user, rest)
+        print(f"\n✅ {insta_user}: {sink.profiles[insta_user]} rows written to {', '.join(sink.paths)}")
+    elif not df.empty:
+        df.to_csv(output_file, index=False, encoding="utf-8-sig")
+        print(f"\n✅ Data saved to {output_file} (Rows: {len(df)})")
+    else:
+        print("\n⚠️ No data scraped.")
+
+    print("\n✅ Scraping completed successfully!")
+
+
+def expand_dom_comments(driver, container, pacer, read=0, max_comments=SCRAPER_MAX_COMMENTS,
+                        max_seconds=SCRAPER_POST_SECONDS):
+    """Comment texts not yet read from `container`, paging through "load more".
+
+    One round trip per page, returning only the comments that page added, so
+    traffic grows linearly with the number of comments. `read` is how many
+    the caller already has; paging stops at max_comments in total or after
+    max_seconds.
+    """
+    started = time.perf_counter()
+    timeout_ms = int(pacer.timeout * 1000)
+    page = driver.execute_async_script(READ_NEW_COMMENTS_SCRIPT, container, COMMENT_SPAN_XPATH, False, timeout_ms)
+    texts = page["texts"]
+    while page["has_more"]:
+        if read + len(texts) >= max_comments:
+            print(f"✂️ Comment cap of {max_comments} reached")
+            break
+        if time.perf_counter() - started >= max_seconds:
+            print(f"✂️ Comment time cap of {max_seconds:.0f}s reached")
+            break
+        pacer.delay("load_more")
+        round_started = time.perf_counter()
+        page = driver.execute_async_script(READ_NEW_COMMENTS_SCRIPT, container, COMMENT_SPAN_XPATH, True, timeout_ms)
+        pacer.record("load_more_comments", time.perf_counter() - round_started, timed_out=page["timed_out"])
+        if not page["texts"]:
+            break
+        texts += page["texts"]
+    return texts[:max(0, max_comments - read)]
+
+
+def read_post(browser, pacer, post_count, start_dt, end_dt):
+    """Reads the post open in the browser (modal or its own page).
+
+    Returns url, datetime, date, time and likes, plus texts: the caption
+    followed by comment texts, read only when the post is within
+    start_dt..end_dt.
+    """
+    driver = browser.driver
+    capture = browser.capture
+    record = None
+    snapshot = None
+    if capture is not None:
+        capture.drain()
+        post_url = driver.current_url
+        record = capture.store.post(shortcode_from_url(post_url))
+    if record is None:
+        snapshot = pacer.until("post_snapshot", lambda: driver.execute_script(
+            EXTRACT_POST_SCRIPT, POST_LAYOUTS, LIKES_XPATH, COMMENT_SPAN_XPATH))
+        post_url = snapshot["url"] if snapshot else driver.current_url
+        if snapshot is None:
+            print("↩️ Post script returned nothing, reading elements one by one")
+
+    # Date
+    if record is not None and record.get("timestamp") is not None:
+        datetime_obj = record["timestamp"]
+        date_posted = datetime_obj.strftime("%Y-%m-%d")
+        time_posted = datetime_obj.strftime("%H:%M:%S")
+    elif snapshot and snapshot["datetime"]:
+        datetime_obj = datetime.fromisoformat(snapshot["datetime"].replace("Z", "+00:00"))
+        date_posted = datetime_obj.strftime("%Y-%m-%d")
+        time_posted = datetime_obj.strftime("%H:%M:%S")
+    else:
+        try:
+            date_element = driver.find_element(By.XPATH, '//time')
+            datetime_str = date_element.get_attribute("datetime")
+            datetime_obj = datetime.fromisoformat(datetime_str.replace("Z", "+00:00"))
+            date_posted = datetime_obj.strftime("%Y-%m-%d")
+            time_posted = datetime_obj.strftime("%H:%M:%S")
+        except NoSuchElementException:
+            datetime_obj = None
+            date_posted, time_posted = "Unknown", "Unknown"
+
+    # Likes
+    if record is not None and "likes" in record:
+        likes = f"{record['likes']:,}" if record["likes"] is not None else "Hidden"
+    elif snapshot:
+        likes = snapshot["likes"] if snapshot["likes"] is not None else "Hidden"
+    else:
+        try:
+            likes = driver.find_element(By.XPATH, LIKES_XPATH).text
+        except NoSuchElementException:
+            likes = "Hidden"
+
+    # Caption & comments
+    all_comments_data = []
+    if datetime_obj and start_dt.date() <= datetime_obj.date() <= end_dt.date() and record is not None and "caption" in record:
+        all_comments_data = collect_network_comments(driver, capture, record, pacer)
+        print(f"✅ {len(all_comments_data) - 1} comments from network payloads for Post {post_count}")
+    elif datetime_obj and start_dt.date() <= datetime_obj.date() <= end_dt.date() and snapshot and snapshot["container"]:
+        all_comments_data = [snapshot["caption"]] + snapshot["comments"]
+        if snapshot["has_more"]:
+            all_comments_data += expand_dom_comments(driver, snapshot["container"], pacer, read=len(snapshot["comments"]))
+        print(f"📝 Caption: {snapshot['caption']}")
+        print(f"✅ {len(all_comments_data) - 1} comments read for Post {post_count}")
+    elif datetime_obj and start_dt.date() <= datetime_obj.date() <= end_dt.date():
+        def find_layout():
+            for container_xpath, caption_xpath in POST_LAYOUTS:
+                containers = driver.find_elements(By.XPATH, container_xpath)
+                if containers:
+                    return containers[0], caption_xpath
+            return None
+
+        try:
+            found = pacer.until("comments_container", find_layout)
+            if found is None:
+                raise NoSuchElementException("no known post layout")
+            comments_container, caption_xpath = found
+            print(f"✅ Comments container found for Post {post_count}")
+            # Caption
+            try:
+                caption_text = comments_container.find_element(By.XPATH, caption_xpath).text.strip()
+                all_comments_data.append(caption_text)
+                print(f"📝 Caption: {caption_text}")
+            except NoSuchElementException:
+                pass
+
+            # Load comments
+            comments = expand_dom_comments(driver, comments_container, pacer)
+            all_comments_data += comments
+            print(f"💬 {len(comments)} comments read")
+        except Exception:
+            print("⚠️ Comments div not found")
+    else:
+        print(f"⏭ Post {post_count} skipped: date {date_posted} not in range.")
+
+    return {
+        "url": post_url,
+        "datetime": datetime_obj,
+        "date": date_posted,
+        "time": time_posted,
+        "likes": likes,
+        "texts": all_comments_data,
+    }
+
+
+def post_rows(profile_url, post_count, post, known_comments=None):
+    """One output row per comment; post-level fields only on the first.
+
+    With known_comments (a post already in the previous dataset), only the
+    comments past that count are returned, and without post-level fields,
+    since the previous rows already carry them. A post known with 0 comments
+    has no previous rows, so its first new comment carries them.
+    """
+    rows = []
+    all_comments_data = post["texts"]
+    first_row = not known_comments
+    if known_comments:
+        all_comments_data = all_comments_data[:1] + all_comments_data[1 + known_comments:]
+    raw_caption = all_comments_data[0] if all_comments_data else ""
+    if raw_caption:
+        parts = raw_caption.split()
+        hashtags = [p for p in parts if p.startswith("#")]
+        caption_clean = " ".join(p for p in parts if not p.startswith("#"))
+        hashtags_text = ", ".join(hashtags)
+    else:
+        caption_clean = ""
+        hashtags_text = ""
+
+    for comment in all_comments_data[1:]:
+        rows.append({
+            "username": profile_url.split("/")[-2],
+            "Post_Number": post_count,
+            "URL": post["url"],
+            "Date": post["date"] if first_row else "",
+            "Time": post["time"] if first_row else "",
+            "Likes": post["likes"] if first_row else "",
+            "Caption": caption_clean if first_row else "",
+            "Hashtags": hashtags_text if first_row else "",
+            "Comments": comment,
+        })
+        first_row = False
+    return rows
+
+
+def open_profile(browser, profile_url):
+    driver = browser.driver
     # ✅ Normalize profile input
     if not profile_url.startswith("http"):
         profile_url = f"https://www.instagram.com/{profile_url.strip().strip('/')}/"
     driver.get(profile_url)
-    print("✅ Profile page loaded")
-    time.sleep(5)
+    return profile_url
 
-    # Click first post
-    first_post_xpath = '/html/body/div[1]/div/div/div[2]/div/div/div[1]/div[2]/div[1]/section/main/div/div/div[2]/div/div/div/div/div[1]/div[1]/a'
-    try:
-        first_post = WebDriverWait(driver, 20).until(
-            EC.element_to_be_clickable((By.XPATH, first_post_xpath))
-        )
-        driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", first_post)
-        time.sleep(5)
-        driver.execute_script("arguments[0].click();", first_post)
-        print("✅ Clicked first post")
-        time.sleep(3)
-    except Exception as e:
-        print(f"⚠️ Error clicking first post: {e}")
-        driver.save_screenshot("click_error.png")
-        driver.quit()
-        return
 
-    # Scrape posts
-    data = []
+def scrape_posts(browser, profile_url, start_date, end_date, pacer, pool=None, mode=SCRAPER_MODE, known=None, on_post=None,
+                 completed=None):
+    """Read the profile's posts in start_date..end_date.
+
+    known maps post URL -> comments already collected (see WatermarkStore);
+    on_post(post_number, post, rows) is called as each post finishes, in
+    Post_Number order; nothing is kept here once it has been passed on.
+    completed(url) returns a post finished by an earlier, interrupted run
+    (see ScrapeJournal); such posts are passed over without being read and
+    are not passed to on_post.
+
+    The browser is renewed between posts when the pool says so (see
+    DriverPool.renew); the walk then starts again from the first post,
+    passing over the posts it has already read.
+    """
+    known = known or {}
+    completed = completed or (lambda url: None)
+    driver = browser.driver
     start_dt = datetime.strptime(start_date, "%Y-%m-%d")
     end_dt = datetime.strptime(end_date, "%Y-%m-%d")
 
+    # Navigate to profile
+    profile_url = open_profile(browser, profile_url)
+    if mode == "grid":
+        scrape_grid(browser, profile_url, start_dt, end_dt, pacer, pool, known=known, on_post=on_post,
+                    completed=completed)
+        return
+
+    if not open_first_post(browser, pacer):
+        return
+
+    # Scrape posts
+    read = {}  # posts read by this walk, passed over if it starts again
     post_count = 0
+    errors = 0
     while True:
+        if pool is not None and pool.renew(browser, failed=errors > 0):
+            driver = browser.driver
+            open_profile(browser, profile_url)
+            if not open_first_post(browser, pacer):
+                break
+            post_count = 0
         post_count += 1
         print(f"\n📸 Scraping Post {post_count}")
+        round_trips_before = browser.round_trips
         try:
-            post_url = driver.current_url
-
-            # Date
-            try:
-                date_element = driver.find_element(By.XPATH, '//time')
-                datetime_str = date_element.get_attribute("datetime")
-                datetime_obj = datetime.fromisoformat(datetime_str.replace("Z", "+00:00"))
-                date_posted = datetime_obj.strftime("%Y-%m-%d")
-                time_posted = datetime_obj.strftime("%H:%M:%S")
-            except NoSuchElementException:
-                datetime_obj = None
-                date_posted, time_posted = "Unknown", "Unknown"
-
-            if post_count > 3 and datetime_obj and datetime_obj.date() < start_dt.date():
+            current_url = driver.current_url
+            post = completed(current_url) or read.get(current_url)
+            resumed = post is not None
+            if resumed:
+                print(f"⏩ Post {post_count} already done")
+            else:
+                browser.posts += 1
+                post = read_post(browser, pacer, post_count, start_dt, end_dt)
+            if post_count > 3 and post["datetime"] and post["datetime"].date() < start_dt.date():
                 print(f"🛑 Post {post_count} is older than start date. Stopping scrape.")
                 break
+            if not resumed:
+                rows = post_rows(profile_url, post_count, post, known.get(post["url"]))
+                read[post["url"]] = post
+                if on_post is not None:
+                    on_post(post_count, post, rows)
 
-            # Likes
-            try:
-                likes = driver.find_element(By.XPATH, '//section[2]/div/div/span/a/span/span').text
-            except NoSuchElementException:
-                likes = "Hidden"
-
-            # Caption & comments
-            all_comments_data = []
-            if datetime_obj and start_dt.date() <= datetime_obj.date() <= end_dt.date():
-                try:
-                    if post_count == 1:
-                        try:
-                            comments_container = WebDriverWait(driver, 10).until(
-                                EC.presence_of_element_located((By.XPATH, '/html/body/div[5]/div[1]/div/div[3]/div/div/div/div/div[2]/div/article/div/div[2]/div/div/div[2]/div[1]/ul/div[3]/div/div'))
-                            )
-                            caption_elem = comments_container.find_element(By.XPATH, '/html/body/div[5]/div[1]/div/div[3]/div/div/div/div/div[2]/div/article/div/div[2]/div/div/div[2]/div[1]/ul/div[1]/li/div/div/div[2]/div[1]/h1')
-                        except Exception:
-                            comments_container = WebDriverWait(driver, 10).until(
-                                EC.presence_of_element_located((By.XPATH, '/html/body/div[4]/div[1]/div/div[3]/div/div/div/div/div[2]/div/article/div/div[2]/div/div/div[2]/div[1]/ul/div[3]/div/div'))
-                            )
-                            caption_elem = comments_container.find_element(By.XPATH, '/html/body/div[4]/div[1]/div/div[3]/div/div/div/div/div[2]/div/article/div/div[2]/div/div/div[2]/div[1]/ul/div[1]/li/div/div/div[2]/div[1]/h1')
-                    else:
-                        try:
-                            comments_container = WebDriverWait(driver, 10).until(
-                                EC.presence_of_element_located((By.XPATH, '/html/body/div[4]/div[1]/div/div[3]/div/div/div/div/div[2]/div/article/div/div[2]/div/div/div[2]/div[1]/ul/div[3]/div/div'))
-                            )
-                            caption_elem = comments_container.find_element(By.XPATH, '/html/body/div[4]/div[1]/div/div[3]/div/div/div/div/div[2]/div/article/div/div[2]/div/div/div[2]/div[1]/ul/div[1]/li/div/div/div[2]/div[1]/h1')
-                        except Exception:
-                            comments_container = WebDriverWait(driver, 10).until(
-                                EC.presence_of_element_located((By.XPATH, '/html/body/div[5]/div[1]/div/div[3]/div/div/div/div/div[2]/div/article/div/div[2]/div/div/div[2]/div[1]/ul/div[3]/div/div'))
-                            )
-                            caption_elem = comments_container.find_element(By.XPATH, '/html/body/div[5]/div[1]/div/div[3]/div/div/div/div/div[2]/div/article/div/div[2]/div/div/div[2]/div[1]/ul/div[1]/li/div/div/div[2]/div[1]/h1')
-
-                    print(f"✅ Comments container found for Post {post_count}")
-                    # Caption
-                    try:
-                        # caption_elem = comments_container.find_element(By.XPATH, '/html/body/div[4]/div[1]/div/div[3]/div/div/div/div/div[2]/div/article/div/div[2]/div/div/div[2]/div[1]/ul/div[1]/li/div/div/div[2]/div[1]/h1')
-                        caption_text = caption_elem.text.strip()
-                        all_comments_data.append(caption_text)
-                        print(f"📝 Caption: {caption_text}")
-                    except NoSuchElementException:
-                        pass
-
-                    # Load comments
-                    prev_count = 0
-                    while True:
-                        comment_blocks = comments_container.find_elements(By.XPATH, './div[position()>=0]/ul/div/li/div/div/div[2]/div[1]/span')
-                        current_count = len(comment_blocks)
-
-                        for comment_elem in comment_blocks[prev_count:]:
-                            try:
-                                comment_text = comment_elem.text.strip()
-                                all_comments_data.append(comment_text)
-                                print(f"💬 Comment: {comment_text}")
-                            except Exception:
-                                continue
-
-                        if current_count == prev_count:
-                            break
-                        prev_count = current_count
-
-                        try:
-                            load_more_btn = comments_container.find_element(By.XPATH, './li/div/button')
-                            driver.execute_script("arguments[0].click();", load_more_btn)
-                            time.sleep(2)
-                        except NoSuchElementException:
-                            break
-                except Exception:
-                    print("⚠️ Comments div not found")
-            else:
-                print(f"⏭ Post {post_count} skipped: date {date_posted} not in range.")
-
-            # Save post data (added hashtag separation here)
-            first_row = True
-            raw_caption = all_comments_data[0] if all_comments_data else ""
-            if raw_caption:
-                parts = raw_caption.split()
-                hashtags = [p for p in parts if p.startswith("#")]
-                caption_clean = " ".join(p for p in parts if not p.startswith("#"))
-                hashtags_text = ", ".join(hashtags)
-            else:
-                caption_clean = ""
-                hashtags_text = ""
-
-            for comment in all_comments_data[1:]:
-                data.append({
-                    "username": profile_url.split("/")[-2],
-                    "Post_Number": post_count,
-                    "URL": post_url,
-                    "Date": date_posted if first_row else "",
-                    "Time": time_posted if first_row else "",
-                    "Likes": likes if first_row else "",
-                    "Caption": caption_clean if first_row else "",
-                    "Hashtags": hashtags_text if first_row else "",
-                    "Comments": comment,
-                })
-                first_row = False
+            round_trips = browser.round_trips - round_trips_before
+            if pool is not None:
+                pool.post_round_trips.append(round_trips)
+            print(f"🔁 {round_trips} WebDriver round trips for Post {post_count}")
 
             # Next post
             try:
-                next_btn = wait.until(EC.element_to_be_clickable((By.XPATH, '//div[contains(@class, "_aaqg") and contains(@class, "_aaqh")]//button[contains(@class, "_abl-")]')))
+                next_btn = pacer.element(driver, "next_button", (By.XPATH, '//div[contains(@class, "_aaqg") and contains(@class, "_aaqh")]//button[contains(@class, "_abl-")]'), clickable=True)
                 driver.execute_script("arguments[0].click();", next_btn)
-                time.sleep(random.uniform(3, 5))
+                pacer.until("next_post", lambda: driver.current_url != post["url"])
+                pacer.delay("post")
             except TimeoutException:
                 print("⚠️ Next button not found, stopping.")
                 break
+            errors = 0
 
         except Exception as e:
             print(f"⚠️ Error scraping post {post_count}: {e}")
+            errors += 1
+            if errors >= SCRAPER_MAX_POST_ERRORS:
+                print(f"🛑 {errors} failed posts in a row, stopping.")
+                break
             continue
 
-    # Save to CSV
-    if data:
-        df = pd.DataFrame(data)
-        df.to_csv(output_file, index=False, encoding="utf-8-sig")
-        print(f"\n✅ Data saved to {output_file} (Rows: {len(df)})")
-    else:
-        print("\n⚠️ No data scraped.")
 
-    driver.quit()
-    print("\n✅ Scraping completed successfully!")
+def open_first_post(browser, pacer):
+    """Click the first post on the open profile page; False if it cannot be opened."""
+    driver = browser.driver
+    first_post_xpath = '/html/body/div[1]/div/div/div[2]/div/div/div[1]/div[2]/div[1]/section/main/div/div/div[2]/div/div/div/div/div[1]/div[1]/a'
+    try:
+        first_post = pacer.element(driver, "first_post", (By.XPATH, first_post_xpath), timeout=20, clickable=True)
+        print("✅ Profile page loaded")
+        driver.execute_script("arguments[0].scrollIntoView({behavior: 'instant', block: 'center'});", first_post)
+        pacer.delay("navigate")
+        driver.execute_script("arguments[0].click();", first_post)
+        print("✅ Clicked first post")
+        pacer.until("post_open", lambda: shortcode_from_url(driver.current_url))
+        return True
+    except Exception as e:
+        print(f"⚠️ Error clicking first post: {e}")
+        driver.save_screenshot("click_error.png")
+        return False
+
+
+def harvest_grid(browser, pacer, start_dt, max_posts=SCRAPER_MAX_GRID_POSTS):
+    """Phase one: scroll the profile grid, returning [(post url, timestamp or None)].
+
+    Timestamps come from feed payloads when network capture is on. Scrolling
+    stops at max_posts, when the grid stops growing, or once a post past the
+    first three (which may be pinned) is known to be older than start_dt.
+    """
+    driver = browser.driver
+    capture = browser.capture
+    if pacer.until("grid_ready", lambda: driver.execute_script(GRID_LINKS_SCRIPT)["urls"], timeout=20) is None:
+        return []
+    posts = {}
+    while len(posts) < max_posts:
+        page = driver.execute_script(GRID_LINKS_SCRIPT)
+        for url in page["urls"]:
+            posts.setdefault(url, None)
+        if capture is not None:
+            capture.drain()
+            for url in posts:
+                record = capture.store.post(shortcode_from_url(url))
+                if record is not None and record.get("timestamp") is not None:
+                    posts[url] = record["timestamp"]
+        if any(ts is not None and ts.date() < start_dt.date() for ts in list(posts.values())[3:]):
+            break
+        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+        grown = pacer.until("grid_page", lambda: driver.execute_script("return document.body.scrollHeight;") > page["height"])
+        if grown is None:
+            break
+        pacer.delay("load_more")
+    print(f"🧱 Harvested {len(posts)} post links from the grid")
+    return list(posts.items())[:max_posts]
+
+
+def gallop_first(lo, hi, pred):
+    """Smallest i in [lo, hi) with pred(i) true, or hi; pred must go false -> true.
+
+    Probes lo, lo+1, lo+3, lo+7, ... until pred holds, then binary searches
+    the last gap, so finding position k costs about 2*log2(k - lo) probes.
+    """
+    bound = 1
+    last_false = lo - 1
+    while lo + bound - 1 < hi and not pred(lo + bound - 1):
+        last_false = lo + bound - 1
+        bound *= 2
+    left, right = last_false + 1, min(lo + bound - 1, hi)
+    while left < right:
+        mid = (left + right) // 2
+        if pred(mid):
+            right = mid
+        else:
+            left = mid + 1
+    return left
+
+
+def seek_date_range(timestamp_at, count, start_dt, end_dt, pinned=3):
+    """Grid positions [first, stop) that can hold posts inside start_dt..end_dt.
+
+    Past the first `pinned` posts the grid is newest first, so the window is
+    found by galloping instead of opening every newer post. timestamp_at(i)
+    may return None when a probe fails; such posts are treated as in range,
+    which can only widen the window.
+    """
+    def not_newer(i):
+        timestamp = timestamp_at(i)
+        return timestamp is None or timestamp.date() <= end_dt.date()
+
+    def older(i):
+        timestamp = timestamp_at(i)
+        return timestamp is not None and timestamp.date() < start_dt.date()
+
+    first = gallop_first(pinned, count, not_newer)
+    return first, gallop_first(first, count, older)
+
+
+def probe_timestamp(browser, url, pacer):
+    """Open a post just far enough to read its timestamp."""
+    driver = browser.driver
+    driver.get(url)
+    if browser.capture is not None:
+        browser.capture.drain()
+        record = browser.capture.store.post(shortcode_from_url(url))
+        if record is not None and record.get("timestamp") is not None:
+            return record["timestamp"]
+    value = pacer.until("timestamp_probe", lambda: driver.execute_script(POST_TIME_SCRIPT))
+    return datetime.fromisoformat(value.replace("Z", "+00:00")) if value else None
+
+
+def scrape_grid(browser, profile_url, start_dt, end_dt, pacer, pool=None, workers=SCRAPER_POST_WORKERS, known=None,
+                on_post=None, completed=None):
+    """Grid mode: harvest post links, then open in-range posts concurrently.
+
+    Posts are fetched on up to `workers` browsers: the one this profile holds
+    plus any the pool can spare right now (the CLI sizes the pool so that every
+    profile job can have all of them). Post_Number is the post's position
+    in the grid, as in serial mode, and finished posts are held back until
+    every earlier one is settled so that on_post sees them in that order.
+    """
+    harvested = harvest_grid(browser, pacer, start_dt)
+    timestamps = {index: timestamp for index, (_, timestamp) in enumerate(harvested) if timestamp is not None}
+    probes = []
+
+    def timestamp_at(index):
+        if index not in timestamps:
+            probes.append(index)
+            timestamps[index] = probe_timestamp(browser, harvested[index][0], pacer)
+        return timestamps[index]
+
+    first, stop = seek_date_range(timestamp_at, len(harvested), start_dt, end_dt)
+    print(f"🔎 Date window is grid posts {first + 1}..{stop} ({len(probes)} timestamp probes)")
+
+    work = queue.Queue()
+    queued = []
+    for index, (url, _) in enumerate(harvested):
+        timestamp = timestamps.get(index)
+        if index >= stop:
+            break
+        if index >= 3 and index < first:
+            continue  # newer than end_date, located by the seek
+        if completed is not None and completed(url) is not None:
+            continue
+        if timestamp is None or start_dt.date() <= timestamp.date() <= end_dt.date():
+            work.put((index + 1, url, 1))
+            queued.append(index + 1)
+        elif timestamp.date() > end_dt.date():
+            print(f"⏭ Post {index + 1} skipped: date {timestamp:%Y-%m-%d} not in range.")
+
+    settled = {}  # number -> (post, rows), or None for a post that is not emitted
+    state = {"stop_at": len(harvested) + 1, "next": 0}
+    lock = threading.Lock()
+
+    def settle(number, result=None):
+        # Called under the lock: emits the finished posts whose predecessors are all settled.
+        settled[number] = result
+        while state["next"] < len(queued) and queued[state["next"]] in settled:
+            number = queued[state["next"]]
+            result = settled.pop(number)
+            state["next"] += 1
+            if result is not None and number < state["stop_at"] and on_post is not None:
+                on_post(number, *result)
+
+    def fetch(worker_browser):
+        failed = False
+        while True:
+            try:
+                number, url, attempt = work.get_nowait()
+            except queue.Empty:
+                return
+            if number >= state["stop_at"]:
+                with lock:
+                    settle(number)
+                continue
+            if pool is not None:
+                pool.renew(worker_browser, failed=failed)
+            worker_browser.posts += 1
+            round_trips_before = worker_browser.round_trips
+            print(f"\n📸 Scraping Post {number}")
+            try:
+                worker_browser.driver.get(url)
+                post = read_post(worker_browser, pacer, number, start_dt, end_dt)
+                failed = False
+            except Exception as e:
+                print(f"⚠️ Error scraping post {number}: {e}")
+                failed = True
+                if attempt < 2:
+                    work.put((number, url, attempt + 1))  # once more, on a renewed browser if this one crashed
+                else:
+                    with lock:
+                        settle(number)
+                continue
+            if number > 3 and post["datetime"] and post["datetime"].date() < start_dt.date():
+                print(f"🛑 Post {number} is older than start date. Stopping scrape.")
+                with lock:
+                    state["stop_at"] = min(state["stop_at"], number)
+                    settle(number)
+                continue
+            rows = post_rows(profile_url, number, post, (known or {}).get(post["url"]))
+            with lock:
+                settle(number, (post, rows))
+            if pool is not None:
+                pool.post_round_trips.append(worker_browser.round_trips - round_trips_before)
+            pacer.delay("post")
+
+    extra = []
+    while pool is not None and len(extra) + 1 < min(workers, work.qsize()):
+        spare = pool.try_acquire()
+        if spare is None:
+            break
+        extra.append(spare)
+    try:
+        with ThreadPoolExecutor(len(extra) + 1) as executor:
+            list(executor.map(fetch, [browser] + extra))
+    finally:
+        for spare in extra:
+            pool.release(spare)
 
 
 # -------------------------
 # CLI Run (multi-profile, single output file)
 
-from concurrent.futures import ThreadPoolExecutor, as_completed
 if __name__ == "__main__":
     import sys
     import os
 
-    if len(sys.argv) < 6:
-        print("Usage: python scraper.py <profile_url(s) comma-separated> <start_date> <end_date> <username> <artifact_name>")
+    if len([arg for arg in sys.argv[1:] if not arg.startswith("--")]) < 5:
+        print("Usage: python scraper.py <profile_url(s) comma-separated> <start_date> <end_date> <username> <artifact_name> [--full] [--resume]")
         sys.exit(1)
 
-    profiles_arg = sys.argv[1]
-    start_date = sys.argv[2]
-    end_date = sys.argv[3]
-    username = sys.argv[4]
-    artifact_name = sys.argv[5]
+    # --full ignores saved watermarks and re-scrapes the whole date range;
+    # --resume continues each profile from its checkpoint journal.
+    full = "--full" in sys.argv[1:]
+    resume = "--resume" in sys.argv[1:]
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    profiles_arg = args[0]
+    start_date = args[1]
+    end_date = args[2]
+    username = args[3]
+    artifact_name = args[4]
 
     profiles = [p.strip() for p in profiles_arg.split(",") if p.strip()]
 
@@ -297,38 +1519,43 @@ if __name__ == "__main__":
         print("⚠️ No profiles provided.")
         sys.exit(1)
 
-    combined_df = pd.DataFrame()
+    max_threads = min(SCRAPER_BROWSERS, len(profiles))
+    # In grid mode every profile job fetches posts on up to
+    # SCRAPER_POST_WORKERS browsers; the extra ones launch when first needed.
+    pool = DriverPool(size=max_threads * SCRAPER_POST_WORKERS if SCRAPER_MODE == "grid" else max_threads)
+    pool.warm_up(max_threads)
+    state = WatermarkStore()
+
+    sink = RowSink(artifact_name)
 
-    def scrape_and_return_df(profile):
+    def scrape_profile(profile):
         try:
-            scrape_instagram(profile, start_date, end_date, username)
-            start_str = datetime.strptime(start_date, "%Y-%m-%d").strftime("%m-%d")
-            end_str = datetime.strptime(end_date, "%Y-%m-%d").strftime("%m-%d")
-            insta_user = profile.strip("/").split("/")[-1]
-            temp_file = f"{start_str}_{end_str}_{insta_user}.csv"
-            if os.path.exists(temp_file):
-                temp_df = pd.read_csv(temp_file, encoding="utf-8-sig")
-                os.remove(temp_file)
-                return temp_df
+            scrape_instagram(profile, start_date, end_date, username, pool=pool, state=state, full=full, resume=resume,
+                             sink=sink)
         except Exception as e:
             print(f"⚠️ Error scraping {profile}: {e}")
-        return pd.DataFrame()
 
-    max_threads = min(5, len(profiles))
     with ThreadPoolExecutor(max_threads) as executor:
-        futures = {executor.submit(scrape_and_return_df, profile): profile for profile in profiles}
+        futures = {executor.submit(scrape_profile, profile): profile for profile in profiles}
         for future in as_completed(futures):
             profile = futures[future]
             try:
-                df = future.result()
-                if not df.empty:
-                    combined_df = pd.concat([combined_df, df], ignore_index=True)
+                future.result()
             except Exception as e:
                 print(f"⚠️ Exception for {profile}: {e}")
+    sink.close()
+    pool.close()
+    state.close()
+    print(f"🧭 Browser pool: {dict(pool.stats)}")
+    print(f"🔁 Round trips per post (before moving to the next post): {pool.round_trip_summary()}")
+    timings = pool.pacer.summary()
+    for name, stats in sorted(timings.items(), key=lambda item: -item[1]["total_seconds"]):
+        print(f"⏱ {name}: {stats['count']}x, total {stats['total_seconds']}s, p95 {stats['p95_seconds']}s, timeouts {stats['timeouts']}")
+    if SCRAPER_TIMINGS_PATH:
+        with open(SCRAPER_TIMINGS_PATH, "w", encoding="utf-8") as f:
+            json.dump(timings, f, indent=2)
 
-    # Save combined CSV
-    if not combined_df.empty:
-        combined_df.to_csv(f"{artifact_name}.csv", index=False, encoding="utf-8-sig")
-        print(f"\n✅ All profiles data combined and saved to {artifact_name}.csv (Rows: {len(combined_df)})")
+    if sink.rows_written:
+        print(f"\n✅ All profiles data combined and saved to {', '.join(sink.paths)} (Rows: {sink.rows_written})")
     else:
         print("⚠️ No data scraped from any profile.")
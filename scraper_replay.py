@@ -0,0 +1,278 @@
+# ----------------------------------
+# scraper_replay.py
+# ----------------------------------
+# Record a scraper run's WebDriver traffic and replay it without Chrome or a
+# network connection.
+#
+# Recording wraps a live driver's command executor, so every command the
+# scraper sends (navigation, find_element(s), execute_script and async
+# scripts, element calls, get_log, CDP commands) is saved with its response,
+# one JSON line per command in <dir>/session_<n>.jsonl. Alongside it go an
+# HTML snapshot of each page the session reaches and the post/comment
+# payloads it captured, in the benchmarks/fixtures capture format.
+#
+#   SCRAPER_RECORD_DIR=recording python scraper.py <profiles> <start> <end> <user> <artifact>
+#
+# Replay serves those responses from a ReplayDriver, a selenium WebDriver
+# whose executor answers from the recording after a simulated latency, so
+# waits, WebElements, exceptions and round-trip counting behave as live.
+#
+#   library = ReplayLibrary("recording")
+#   pool = DriverPool(driver_factory=library.driver_factory(latency=0.02))
+#
+# Responses are looked up by (page, command, parameters). The page is the
+# last URL the session navigated to or read back from current_url (get()
+# itself is looked up by its target alone). A
+# command repeated on the same page gets the recorded responses in order,
+# the last one repeating once they run out.
+import base64
+import glob
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import Counter
+
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.remote.command import Command
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from instagram_payloads import is_payload_url
+
+SESSION_PATTERN = "session_*.jsonl"
+# Parameters that never change what the page answers.
+UNKEYED_PARAMS = ("sessionId",)
+_session_lock = threading.Lock()
+
+
+def _key(page, command, params):
+    if command == Command.GET:
+        page = None  # where a browser navigates from depends on scheduling, not on the page
+    params = {name: value for name, value in (params or {}).items() if name not in UNKEYED_PARAMS}
+    script = params.get("script")
+    if isinstance(script, str):
+        # Scripts are long and repeated; their hash identifies them.
+        params["script"] = hashlib.sha1(script.encode("utf-8")).hexdigest()
+    return json.dumps([page, command, params], sort_keys=True, ensure_ascii=False)
+
+
+def _next_page(page, command, params, response):
+    if command == Command.GET:
+        return params.get("url", page)
+    if command == Command.GET_CURRENT_URL and isinstance(response, dict) and isinstance(response.get("value"), str):
+        return response["value"]
+    return page
+
+
+# ------------------------
+# Recording
+# ------------------------
+class RecordingExecutor:
+    """Forwards commands to a live executor and appends each exchange to a session file."""
+
+    def __init__(self, executor, path, snapshots=True):
+        self.executor = executor
+        self.path = path
+        self.snapshots = snapshots
+        self.page = None
+        self.commands = 0
+        self._lock = threading.Lock()
+        self._file = open(path, "w", encoding="utf-8")
+        self._session_id = None
+        self._pages_seen = set()
+        self._payload_urls = {}  # requestId -> url of a post/comment response
+        self.payloads = []
+
+    def __getattr__(self, name):
+        return getattr(self.executor, name)
+
+    def execute(self, command, params):
+        response = self.executor.execute(command, params)
+        with self._lock:
+            self.commands += 1
+            if command == Command.NEW_SESSION:
+                self._session_id = ((response or {}).get("value") or {}).get("sessionId")
+            entry = {"page": self.page, "command": command, "params": params, "response": response}
+            self._file.write(json.dumps(entry, ensure_ascii=False, default=str) + "\n")
+            self._note_payloads(command, params, response)
+            self.page = _next_page(self.page, command, params, response)
+            if command == Command.QUIT:
+                self.finish()
+        if self.snapshots and self.page is not None and self.page not in self._pages_seen and command != Command.QUIT:
+            self._pages_seen.add(self.page)
+            self._snapshot()
+        return response
+
+    def _note_payloads(self, command, params, response):
+        value = (response or {}).get("value")
+        if command == Command.GET_LOG and isinstance(value, list):
+            for entry in value:
+                try:
+                    message = json.loads(entry["message"])["message"]
+                except (KeyError, TypeError, ValueError):
+                    continue
+                if message.get("method") == "Network.responseReceived":
+                    url = message.get("params", {}).get("response", {}).get("url")
+                    if is_payload_url(url):
+                        self._payload_urls[message["params"]["requestId"]] = url
+        elif command == "executeCdpCommand" and params.get("cmd") == "Network.getResponseBody" and isinstance(value, dict):
+            url = self._payload_urls.get(params.get("params", {}).get("requestId"))
+            if url is not None:
+                body = value.get("body", "")
+                if value.get("base64Encoded"):
+                    body = base64.b64decode(body).decode("utf-8", "replace")
+                self.payloads.append({"url": url, "body": body})
+
+    def _snapshot(self):
+        # Straight to the live executor: not part of the recording and not
+        # counted as one of the scraper's round trips.
+        try:
+            response = self.executor.execute(Command.GET_PAGE_SOURCE, {"sessionId": self._session_id})
+        except Exception:
+            return
+        html = (response or {}).get("value")
+        if not isinstance(html, str):
+            return
+        directory = self.path[:-len(".jsonl")] + "_pages"
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, f"{len(self._pages_seen):04d}.html"), "w", encoding="utf-8") as f:
+            f.write(f"<!-- {self.page} -->\n{html}")
+
+    def finish(self):
+        """Close the session file and write the captured payloads next to it."""
+        if self._file.closed:
+            return
+        self._file.close()
+        with open(self.path[:-len(".jsonl")] + "_payloads.json", "w", encoding="utf-8") as f:
+            json.dump({"payloads": self.payloads}, f, ensure_ascii=False)
+
+    def close(self):
+        self.finish()
+        close = getattr(self.executor, "close", None)
+        if close is not None:
+            close()
+
+
+def record(driver, directory, snapshots=True):
+    """Start recording `driver` (already in session) into the next session file in `directory`.
+
+    Commands from here on are recorded; the session file is closed when the
+    driver quits.
+    """
+    os.makedirs(directory, exist_ok=True)
+    with _session_lock:
+        index = len(glob.glob(os.path.join(directory, SESSION_PATTERN)))
+        path = os.path.join(directory, f"session_{index:03d}.jsonl")
+        open(path, "w").close()  # claim the name before releasing the lock
+    recorder = RecordingExecutor(driver.command_executor, path, snapshots=snapshots)
+    recorder._session_id = driver.session_id
+    driver.command_executor = recorder
+    return recorder
+
+
+# ------------------------
+# Replay
+# ------------------------
+class ReplayLibrary:
+    """Recorded responses from every session file in a recording directory."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.responses = {}
+        paths = sorted(glob.glob(os.path.join(directory, SESSION_PATTERN)))
+        if not paths:
+            raise FileNotFoundError(f"No {SESSION_PATTERN} files in {directory}")
+        for path in paths:
+            session = {}
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    entry = json.loads(line)
+                    if entry["command"] in (Command.NEW_SESSION, Command.QUIT):
+                        continue
+                    key = _key(entry["page"], entry["command"], entry["params"])
+                    session.setdefault(key, []).append(entry["response"])
+            # Sessions that saw the same page (every browser logs in on the
+            # homepage) recorded the same exchanges; the first one is kept.
+            for key, responses in session.items():
+                self.responses.setdefault(key, responses)
+        self._sessions = 0
+        self._lock = threading.Lock()
+
+    def driver(self, latency=0.0, command_latency=None):
+        with self._lock:
+            self._sessions += 1
+            session_id = f"replay-{self._sessions}"
+        return ReplayDriver(ReplayExecutor(self, session_id, latency, command_latency))
+
+    def driver_factory(self, latency=0.0, command_latency=None):
+        """A DriverPool driver_factory that hands out replay drivers."""
+        return lambda extraction=None: self.driver(latency, command_latency)
+
+
+class ReplayExecutor:
+    """Answers WebDriver commands from a ReplayLibrary.
+
+    Every command sleeps `latency` seconds (or command_latency[command]) to
+    stand in for the chromedriver round trip. Commands that were never
+    recorded on the current page answer like a page without the element
+    (find commands) or with an error, and are counted in stats["misses"].
+    """
+
+    def __init__(self, library, session_id, latency=0.0, command_latency=None):
+        self.library = library
+        self.session_id = session_id
+        self.latency = latency
+        self.command_latency = command_latency or {}
+        self.page = None
+        self._cursors = Counter()
+        self.stats = Counter()
+
+    def execute(self, command, params):
+        delay = self.command_latency.get(command, self.latency)
+        if delay:
+            time.sleep(delay)
+        self.stats["commands"] += 1
+        self.stats["latency_seconds"] += delay
+        if command == Command.NEW_SESSION:
+            return {"value": {"sessionId": self.session_id, "capabilities": {"browserName": "chrome"}}}
+        if command == Command.QUIT:
+            return {"value": None}
+
+        key = _key(self.page, command, params)
+        responses = self.library.responses.get(key)
+        if responses:
+            response = responses[min(self._cursors[key], len(responses) - 1)]
+            self._cursors[key] += 1
+        else:
+            self.stats["misses"] += 1
+            response = self._miss(command)
+        response = json.loads(json.dumps(response))  # callers may mutate it
+        self.page = _next_page(self.page, command, params, response)
+        return response
+
+    def close(self):
+        pass
+
+    def _miss(self, command):
+        if command == Command.FIND_ELEMENTS or command == Command.FIND_CHILD_ELEMENTS:
+            return {"value": []}
+        if command == Command.FIND_ELEMENT or command == Command.FIND_CHILD_ELEMENT:
+            error, message = "no such element", "not in the recording"
+        else:
+            error, message = "unknown error", f"{command} on {self.page} is not in the recording"
+        return {"status": error, "value": {"error": error, "message": message, "stacktrace": ""}}
+
+
+class ReplayDriver(WebDriver):
+    """A selenium WebDriver served by an in-process executor (a ReplayExecutor) instead of chromedriver."""
+
+    def __init__(self, executor):
+        super().__init__(command_executor=executor, options=Options())
+
+    @property
+    def stats(self):
+        return getattr(self.command_executor, "stats", Counter())
+
+    def get_log(self, log_type):
+        return self.execute(Command.GET_LOG, {"type": log_type})["value"]
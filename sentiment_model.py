@@ -211,13 +211,28 @@
 
 
 # sentiment_model.py
-import torch
-import torch.nn.functional as F
-from transformers import AutoTokenizer, AutoModelForSequenceClassification
+# torch and transformers are imported inside the functions that need them, so
+# importing this module (e.g. from app.py at start-up) stays cheap and only
+# the first model load pays for them.
+import gc
+import hashlib
+import json
+import multiprocessing
+import os
 import re
+import sqlite3
+import sys
+import threading
+import time
+from collections import Counter, OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 import emoji
 import pandas as pd
-from tqdm import tqdm
+
+DEFAULT_MODEL_NAME = "DSL-13-SRMAP/MuRIL_WR"
+# Bump whenever EnhancedTeluguPreprocessor changes its output for the same
+# rules, so cached sentiment results computed with the old logic are dropped.
+PREPROCESSOR_VERSION = 1
 
 # ------------------------
 # Rules Dictionary
@@ -251,6 +266,9 @@ rules_dict = {
         "fyi": "information", "btw": "by the way", "imo": "in my opinion", "em": "enti", "emiti": "enti", "evd": "evadu", "evr": "evaru"
     },
     "code_switch_markers": ["but", "kani", "kaani", "and", "mariyu", "or", "leda"],
+    "emoji_positive": ["😊", "😃", "😄", "👍", "❤️", "💕", "🎉", "✨", "🙏", "👏", "💪", "😍", "🔥", "🥰", "💐"],
+    "emoji_negative": ["😞", "😢", "😠", "😡", "👎", "💔", "😤", "🤬", "😭"],
+    "emoji_sarcastic": ["🙄", "😏", "🤔", "😒", "🤨", "😂"],
     "booster_words": ["chaala", "super", "goppa", "bhale", "bavundi", "bavunna", "best", "excellent", "great", "really"],
     "translit_variants": {
         "nennu": "nenu", "miru": "meeru", "vunnadi": "unnadi", "chusanu": "chusanu",
@@ -261,61 +279,886 @@ rules_dict = {
 # ------------------------
 # Enhanced Telugu Preprocessor
 # ------------------------
+def rules_version(rules):
+    payload = json.dumps([PREPROCESSOR_VERSION, rules], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+def _fold(word):
+    # Case folding that groups words the way re.IGNORECASE compares them; the
+    # dotless i is the one character re treats as equal to "i" but casefold
+    # does not.
+    return word.casefold().replace("\u0131", "i")
+
+class CompiledRuleTable:
+    """One rule mapping ({word: replacement}) compiled for repeated use.
+
+    Applying the rules one re.sub at a time costs a regex scan per rule. When
+    the table allows it, the text is instead scanned once for word runs and
+    each run is looked up in a dict, so the cost no longer grows with the
+    number of rules. That is only done when it provably gives the same result
+    as the sequential loop: every key is a single word (so matches are whole
+    word runs and cannot overlap), no replacement uses backslash escapes, and
+    no replacement contains a word that a later rule would rewrite. Other
+    tables fall back to per-rule patterns compiled once.
+    """
+
+    _WORD = re.compile(r"\w+")
+
+    def __init__(self, mapping):
+        self.rules = list(mapping.items())
+        self._keys_by_fold = {}
+        for idx, (key, _) in enumerate(self.rules):
+            self._keys_by_fold.setdefault(_fold(key), []).append(idx)
+        self._key_patterns = [re.compile(re.escape(key), re.IGNORECASE) for key, _ in self.rules]
+
+        self.single_pass = bool(self.rules) and self._single_pass_safe()
+        self.sequential = [] if self.single_pass else [
+            (re.compile(rf"\b{re.escape(key)}\b", re.IGNORECASE), value) for key, value in self.rules
+        ]
+
+    def _match(self, word):
+        # First rule, in table order, whose key matches the word ignoring case.
+        for idx in self._keys_by_fold.get(_fold(word), ()):
+            if self.rules[idx][0] == word or self._key_patterns[idx].fullmatch(word):
+                return idx
+        return None
+
+    def _single_pass_safe(self):
+        if any(not self._WORD.fullmatch(key) for key, _ in self.rules):
+            return False
+        if any("\\" in value for _, value in self.rules):
+            return False
+        for idx, (_, value) in enumerate(self.rules):
+            for word in self._WORD.findall(value):
+                for later in self._keys_by_fold.get(_fold(word), ()):
+                    later_key, later_value = self.rules[later]
+                    if later > idx and later_value != word and self._key_patterns[later].fullmatch(word):
+                        return False
+        return True
+
+    def _replace(self, match):
+        idx = self._match(match.group(0))
+        return match.group(0) if idx is None else self.rules[idx][1]
+
+    def apply(self, text):
+        if self.single_pass:
+            return self._WORD.sub(self._replace, text)
+        for pattern, value in self.sequential:
+            text = pattern.sub(value, text)
+        return text
+
+    def apply_series(self, texts):
+        if self.single_pass:
+            return texts.str.replace(self._WORD, self._replace, regex=True)
+        for pattern, value in self.sequential:
+            texts = texts.str.replace(pattern, value, regex=True)
+        return texts
+
 class EnhancedTeluguPreprocessor:
     def __init__(self, rules_dict=rules_dict):
         self.rules = rules_dict
+        self.version = rules_version(rules_dict)
         self.negations = {word: "not" for word in self.rules.get("negation_words", [])}
         self.boosters = {word: word for word in self.rules.get("booster_words", [])}
         self.translit_variants = self.rules.get("translit_variants", {})
         self.punctuation_pattern = re.compile(r"[^\w\s]", re.UNICODE)
-
-    def _apply_rules(self, text, mapping):
-        for key, val in mapping.items():
-            text = re.sub(rf"\b{re.escape(key)}\b", val, text, flags=re.IGNORECASE)
-        return text
+        # Applied in this order, same as the original per-rule loop.
+        self.rule_tables = [
+            CompiledRuleTable(self.translit_variants),
+            CompiledRuleTable(self.negations),
+            CompiledRuleTable(self.boosters),
+        ]
 
     def preprocess(self, text):
         if not isinstance(text, str):
             return ""
         text = text.strip().lower()
-        text = self._apply_rules(text, self.translit_variants)
-        text = self._apply_rules(text, self.negations)
-        text = self._apply_rules(text, self.boosters)
+        for table in self.rule_tables:
+            text = table.apply(text)
         text = self.punctuation_pattern.sub("", text)
         text = emoji.replace_emoji(text, replace='')  # simple emoji removal
         return text
 
+    def preprocess_series(self, texts: pd.Series) -> pd.Series:
+        """Vectorized preprocess over a Series; same output as preprocess per element."""
+        is_text = texts.map(lambda value: isinstance(value, str)).astype(bool)
+        texts = texts.where(is_text, "").astype(object)
+        texts = texts.str.strip().str.lower()
+        for table in self.rule_tables:
+            texts = table.apply_series(texts)
+        texts = texts.str.replace(self.punctuation_pattern, "", regex=True)
+        return texts.map(lambda text: emoji.replace_emoji(text, replace=''))
+
+# ------------------------
+# Lexicon Fast Path
+# ------------------------
+# First stage of the cascade in analyze_comments: empty comments, tags of
+# other users, emoji-only comments and one-to-few word praise or complaints
+# are labelled from rules_dict alone. Anything negated, mixed, unknown or in
+# Telugu script is left for the model.
+CASCADE_THRESHOLD = float(os.environ.get("SENTIMENT_CASCADE_THRESHOLD", "90"))
+
+# Running totals of which stage labelled each comment, across reports.
+stage_counts = Counter()
+
+def stage_shares():
+    total = sum(stage_counts.values())
+    return {stage: count / total for stage, count in stage_counts.items()} if total else {}
+
+class LexiconClassifier:
+    _MENTION = re.compile(r"@[\w.]+")
+    _WORD = re.compile(r"\w+")
+    _TELUGU = re.compile(r"[\u0C00-\u0C7F]")
+    # Fallback for emojis not listed in rules_dict, matched on emoji names.
+    _POSITIVE_NAMES = ("smil", "joy", "heart", "thumbs_up", "clap", "party", "pray", "fire", "star")
+    _NEGATIVE_NAMES = ("angry", "sad", "thumbs_down", "cry", "frown", "rage", "broken", "pouting")
+
+    def __init__(self, rules_dict=rules_dict, max_words=3):
+        self.max_words = max_words
+        self.polarity = {}
+        for label in ("positive", "negative", "neutral"):
+            for word in rules_dict.get("sentiment_words", {}).get(label, []):
+                self.polarity.setdefault(word, label)
+        self.negations = set(rules_dict.get("negation_words", []))
+        self.stop_words = set(rules_dict.get("telugu_stop_words", [])) - set(self.polarity)
+        self.variants = rules_dict.get("translit_variants", {})
+        self.emoji_polarity = {char: "positive" for char in rules_dict.get("emoji_positive", [])}
+        self.emoji_polarity.update({char: "negative" for char in rules_dict.get("emoji_negative", [])})
+        self.sarcasm_emojis = set(rules_dict.get("emoji_sarcastic", []))
+
+    def _emoji_label(self, char):
+        if char in self.sarcasm_emojis:
+            return "sarcastic"
+        if char in self.emoji_polarity:
+            return self.emoji_polarity[char]
+        name = emoji.demojize(char)
+        if any(part in name for part in self._NEGATIVE_NAMES):
+            return "negative"
+        if any(part in name for part in self._POSITIVE_NAMES):
+            return "positive"
+        return None
+
+    def classify(self, text):
+        """Return (label, confidence 0-100) for trivial comments, else None."""
+        if not isinstance(text, str):
+            text = ""
+        if self._TELUGU.search(text):
+            return None
+
+        emoji_labels = {self._emoji_label(item["emoji"]) for item in emoji.emoji_list(text)}
+        rest = self._MENTION.sub(" ", emoji.replace_emoji(text, replace=" ")).lower()
+        words = [self.variants.get(word, word) for word in self._WORD.findall(rest)]
+
+        if not words:
+            if not emoji_labels:
+                return "neutral", 99.0
+            if len(emoji_labels) == 1 and emoji_labels <= {"positive", "negative"}:
+                return emoji_labels.pop(), 92.0
+            return "neutral", 60.0
+
+        if "sarcastic" in emoji_labels or len(words) > self.max_words or any(word in self.negations for word in words):
+            return None
+        content = [word for word in words if word not in self.stop_words]
+        if any(word not in self.polarity for word in content):
+            return None
+
+        labels = {self.polarity[word] for word in content}
+        if not labels:
+            return "neutral", 80.0
+        if len(labels) > 1:
+            return None
+        label = labels.pop()
+        if emoji_labels - {None, label}:
+            return None
+        return label, 95.0
+
+# ------------------------
+# Model Source
+# ------------------------
+# SENTIMENT_MODEL_DIR points at a pinned local snapshot (see snapshot_model);
+# when it is set, or SENTIMENT_OFFLINE=1, nothing is resolved against the hub.
+# SENTIMENT_MODEL_REVISION pins the hub revision when loading online.
+SENTIMENT_MODEL_DIR = os.environ.get("SENTIMENT_MODEL_DIR")
+SENTIMENT_OFFLINE = os.environ.get("SENTIMENT_OFFLINE", "0") == "1"
+SENTIMENT_MODEL_REVISION = os.environ.get("SENTIMENT_MODEL_REVISION")
+SNAPSHOT_MANIFEST = "snapshot.json"
+
+def _read_manifest(directory):
+    try:
+        with open(os.path.join(directory, SNAPSHOT_MANIFEST), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def resolve_model_source(model_name):
+    """Return (path or hub id, pinned revision or None, from_pretrained options)."""
+    if os.path.isdir(model_name):
+        return model_name, _read_manifest(model_name).get("revision"), {"local_files_only": True}
+    if SENTIMENT_MODEL_DIR:
+        manifest = _read_manifest(SENTIMENT_MODEL_DIR)
+        if manifest.get("model_name", model_name) == model_name:
+            return SENTIMENT_MODEL_DIR, manifest.get("revision"), {"local_files_only": True}
+    if SENTIMENT_OFFLINE:
+        return model_name, None, {"local_files_only": True}
+    if SENTIMENT_MODEL_REVISION:
+        return model_name, SENTIMENT_MODEL_REVISION, {"revision": SENTIMENT_MODEL_REVISION}
+    return model_name, None, {}
+
+def snapshot_model(target_dir, model_name=DEFAULT_MODEL_NAME, revision=None):
+    """Download a pinned copy of the model for offline loading via SENTIMENT_MODEL_DIR."""
+    from huggingface_hub import HfApi, snapshot_download
+
+    revision = revision or HfApi().model_info(model_name).sha
+    snapshot_download(model_name, revision=revision, local_dir=target_dir)
+    with open(os.path.join(target_dir, SNAPSHOT_MANIFEST), "w", encoding="utf-8") as f:
+        json.dump({"model_name": model_name, "revision": revision}, f)
+    return target_dir
+
+# ------------------------
+# Inference Backends
+# ------------------------
+# "torch" runs the fp32 checkpoint as is. "torch-int8" applies dynamic int8
+# quantization to every Linear layer (CPU only). "onnx" exports the graph once
+# and runs it with onnxruntime. Quantized models and ONNX graphs are written
+# under BACKEND_CACHE_DIR so the conversion only happens on first use.
+BACKENDS = ("torch", "torch-int8", "onnx")
+SENTIMENT_BACKEND = os.environ.get("SENTIMENT_BACKEND", "torch")
+BACKEND_CACHE_DIR = os.environ.get(
+    "SENTIMENT_BACKEND_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "instagram_sentiment", "backends"),
+)
+
+def default_device():
+    import torch
+
+    return "cuda" if torch.cuda.is_available() else "cpu"
+
+def _backend_cache_path(fingerprint, filename):
+    directory = os.path.join(BACKEND_CACHE_DIR, re.sub(r"[^\w.-]+", "_", fingerprint))
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, filename)
+
+def _write_atomically(path, write):
+    # Several processes may convert the same model at once; only a complete
+    # file is ever moved into place.
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def _load_fp32_model(source, load_options):
+    from transformers import AutoModelForSequenceClassification
+
+    # low_cpu_mem_usage skips the random initialisation pass, and safetensors
+    # checkpoints are memory-mapped rather than read into a second copy.
+    return AutoModelForSequenceClassification.from_pretrained(source, low_cpu_mem_usage=True, **load_options).eval()
+
+class TorchBackend:
+    def __init__(self, source, device, fingerprint, load_options):
+        self.device = device
+        self.model = _load_fp32_model(source, load_options).to(device)
+
+    def __call__(self, inputs):
+        import torch
+
+        with torch.no_grad():
+            return self.model(**inputs.to(self.device)).logits
+
+def _plain_state(state):
+    """A dynamically quantized state_dict as plain tensors only.
+
+    Quantized weights become their int8 values, scale and zero point, so the
+    file loads with weights_only=True and pickles no torch qscheme objects
+    (whose lookup walks sys.modules, importing transformers' lazy modules).
+    """
+    import torch
+
+    plain = {}
+
+    def add(key, value):
+        if isinstance(value, tuple):
+            for index, item in enumerate(value):
+                add(f"{key}.{index}", item)
+        elif isinstance(value, torch.Tensor) and value.is_quantized:
+            if value.qscheme() != torch.per_tensor_affine:
+                raise ValueError(f"Unsupported quantization scheme {value.qscheme()} for {key}")
+            plain[f"{key}.int_repr"] = value.int_repr()
+            plain[f"{key}.scale"] = torch.tensor(value.q_scale(), dtype=torch.float64)
+            plain[f"{key}.zero_point"] = torch.tensor(value.q_zero_point())
+        elif isinstance(value, torch.Tensor):
+            plain[key] = value.detach()
+
+    for key, value in state.items():
+        add(key, value)
+    return plain
+
+def _quantized_state(plain, template):
+    """Inverse of _plain_state, shaped like `template` (a freshly quantized model's state_dict)."""
+    import torch
+
+    def get(key, like):
+        if isinstance(like, tuple):
+            return tuple(get(f"{key}.{index}", item) for index, item in enumerate(like))
+        if isinstance(like, torch.Tensor) and like.is_quantized:
+            return torch._make_per_tensor_quantized_tensor(
+                plain[f"{key}.int_repr"], plain[f"{key}.scale"].item(), plain[f"{key}.zero_point"].item()
+            )
+        if isinstance(like, torch.Tensor):
+            return plain[key]
+        return like  # dtypes and other settings come from the template
+
+    state = type(template)((key, get(key, value)) for key, value in template.items())
+    # Quantized modules read their state format from the version metadata.
+    state._metadata = getattr(template, "_metadata", None)
+    return state
+
+class TorchInt8Backend(TorchBackend):
+    def __init__(self, source, device, fingerprint, load_options):
+        import torch
+
+        if device != "cpu":
+            raise ValueError("The torch-int8 backend only runs on CPU.")
+        self.device = device
+        # Only the quantized weights are cached, never a pickled module: the
+        # model is rebuilt from its config and quantized the same way, then
+        # the weights are loaded with weights_only=True.
+        path = _backend_cache_path(fingerprint, "torch-int8.state.pt")
+        if os.path.exists(path):
+            from transformers import AutoConfig, AutoModelForSequenceClassification
+
+            config = AutoConfig.from_pretrained(source, **load_options)
+            skeleton = AutoModelForSequenceClassification.from_config(config)
+            self.model = torch.ao.quantization.quantize_dynamic(skeleton, {torch.nn.Linear}, dtype=torch.qint8)
+            plain = torch.load(path, weights_only=True)
+            self.model.load_state_dict(_quantized_state(plain, self.model.state_dict()))
+        else:
+            fp32 = _load_fp32_model(source, load_options)
+            self.model = torch.ao.quantization.quantize_dynamic(fp32, {torch.nn.Linear}, dtype=torch.qint8)
+            _write_atomically(path, lambda tmp: torch.save(_plain_state(self.model.state_dict()), tmp))
+        self.model.eval()
+
+class OnnxBackend:
+    def __init__(self, source, device, fingerprint, load_options, input_names):
+        try:
+            import onnxruntime
+        except ImportError as e:
+            raise ImportError("The onnx backend needs the onnx and onnxruntime packages.") from e
+
+        path = _backend_cache_path(fingerprint, "model.onnx")
+        if not os.path.exists(path):
+            _write_atomically(path, lambda tmp: self._export(source, load_options, input_names, tmp))
+
+        providers = ["CPUExecutionProvider"]
+        if device.startswith("cuda"):
+            providers.insert(0, "CUDAExecutionProvider")
+        self.session = onnxruntime.InferenceSession(path, providers=providers)
+        self.input_names = [node.name for node in self.session.get_inputs()]
+
+    @staticmethod
+    def _export(source, load_options, input_names, path):
+        import torch
+
+        model = _load_fp32_model(source, load_options)
+
+        class LogitsOnly(torch.nn.Module):
+            # Positional inputs in tokenizer order so the exporter binds each
+            # graph input to the right argument.
+            def __init__(self):
+                super().__init__()
+                self.model = model
+
+            def forward(self, *tensors):
+                return self.model(**dict(zip(input_names, tensors))).logits
+
+        dummy = tuple(torch.ones(2, 8, dtype=torch.long) for _ in input_names)
+        dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+        dynamic_axes["logits"] = {0: "batch"}
+        with torch.no_grad():
+            torch.onnx.export(
+                LogitsOnly(), dummy, path,
+                input_names=list(input_names), output_names=["logits"],
+                dynamic_axes=dynamic_axes, opset_version=17, dynamo=False,
+            )
+
+    def __call__(self, inputs):
+        import torch
+
+        feed = {name: inputs[name].cpu().numpy() for name in self.input_names}
+        return torch.from_numpy(self.session.run(["logits"], feed)[0])
+
 # ------------------------
 # Sentiment Model Wrapper
 # ------------------------
+TELUGU_RANGE = "[\u0C00-\u0C7F]"
+TELUGU_PATTERN = re.compile(TELUGU_RANGE)
+
+def contains_telugu(text):
+    return bool(TELUGU_PATTERN.search(text))
+
+# Native-script comments go to MuRIL as written; romanized ones are
+# normalized by the preprocessor first. Each route is tokenized separately and
+# can have its own max length (None means the model maximum).
+ROUTES = ("native", "romanized")
+ROUTE_MAX_LENGTH = {
+    "native": int(os.environ["SENTIMENT_NATIVE_MAX_LENGTH"]) if os.environ.get("SENTIMENT_NATIVE_MAX_LENGTH") else None,
+    "romanized": int(os.environ["SENTIMENT_ROMANIZED_MAX_LENGTH"]) if os.environ.get("SENTIMENT_ROMANIZED_MAX_LENGTH") else None,
+}
+
+def prepare_text(text, preprocessor):
+    if contains_telugu(text):
+        return text.strip()
+    return preprocessor.preprocess(text)
+
+def route_texts(texts: pd.Series) -> pd.Series:
+    """True where a comment contains Telugu script (native route), False for romanized."""
+    # Pass the pattern as a string of literal characters: Arrow-backed string
+    # columns run it through RE2, which does not understand \u escapes.
+    return texts.str.contains(TELUGU_RANGE, regex=True, na=False).astype(bool)
+
+def route_counts(texts: pd.Series):
+    native = int(route_texts(texts).sum())
+    return {"native": native, "romanized": len(texts) - native}
+
+def prepare_texts(texts, preprocessor):
+    """Vectorized prepare_text over a whole column, routing by script."""
+    texts = pd.Series(list(texts), dtype=object)
+    native = route_texts(texts)
+    prepared = pd.Series("", index=texts.index, dtype=object)
+    if native.any():
+        prepared[native] = texts[native].str.strip()
+    if not native.all():
+        prepared[~native] = preprocessor.preprocess_series(texts[~native])
+    return prepared.tolist()
+
 class MuRILSentiment:
-    def __init__(self, model_name="DSL-13-SRMAP/MuRIL_WR", rules_dict=rules_dict):
-        self.device = "cuda" if torch.cuda.is_available() else "cpu"
-        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
-        self.model = AutoModelForSequenceClassification.from_pretrained(model_name).to(self.device)
+    def __init__(self, model_name=DEFAULT_MODEL_NAME, rules_dict=rules_dict, device=None, backend="torch", route_max_length=None):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unsupported sentiment backend {backend!r}; expected one of {BACKENDS}")
+        from transformers import AutoConfig, AutoTokenizer
+
+        self.model_name = model_name
+        self.device = device or default_device()
+        self.backend_name = backend
+        source, self.revision, load_options = resolve_model_source(model_name)
+        self.config = AutoConfig.from_pretrained(source, **load_options)
+        self.tokenizer = AutoTokenizer.from_pretrained(source, **load_options)
+        if backend == "onnx":
+            self.backend = OnnxBackend(source, self.device, self.fingerprint, load_options, self.tokenizer.model_input_names)
+        elif backend == "torch-int8":
+            self.backend = TorchInt8Backend(source, self.device, self.fingerprint, load_options)
+        else:
+            self.backend = TorchBackend(source, self.device, self.fingerprint, load_options)
+        self.model = getattr(self.backend, "model", None)
         self.preprocessor = EnhancedTeluguPreprocessor(rules_dict)
         self.labels = ["negative", "neutral", "positive"]
+        self.route_max_length = dict(ROUTE_MAX_LENGTH, **(route_max_length or {}))
+        # Fast tokenizers are not safe to call from several threads at once
+        # ("Already borrowed"), and registry instances are shared by sessions.
+        self._tokenizer_lock = threading.Lock()
 
     def _contains_telugu(self, text):
-        return bool(re.search(r'[\u0C00-\u0C7F]', text))
+        return contains_telugu(text)
+
+    def _prepare(self, text):
+        return prepare_text(text, self.preprocessor)
 
     def predict(self, text):
-        if self._contains_telugu(text):
-            processed_text = text.strip()
+        labels, confidences = self.predict_batch([text])
+        return labels[0], confidences[0]
+
+    def _length_buckets(self, lengths, max_batch_tokens, max_batch_size):
+        # Sort by token length so each batch pads to a similar size, then cut a
+        # new batch whenever the padded size would exceed the token budget.
+        order = sorted(range(len(lengths)), key=lengths.__getitem__)
+        batch = []
+        for idx in order:
+            # Lengths are ascending, so the newest item sets the padded width.
+            if batch and (len(batch) >= max_batch_size or lengths[idx] * (len(batch) + 1) > max_batch_tokens):
+                yield batch
+                batch = []
+            batch.append(idx)
+        if batch:
+            yield batch
+
+    @property
+    def fingerprint(self):
+        # Hub downloads carry the resolved commit; pinned snapshots record it
+        # in snapshot.json; other local directories have none.
+        revision = self.revision or getattr(self.config, "_commit_hash", None) or "local"
+        suffix = "" if self.backend_name == "torch" else f"+{self.backend_name}"
+        return f"{self.model_name}@{revision}{suffix}"
+
+    @property
+    def cache_fingerprint(self):
+        # Route max lengths change the scores of long comments, so cached
+        # results are only valid for the lengths they were computed with.
+        lengths = ",".join(f"{route}={self.route_max_length.get(route) or 'max'}" for route in ROUTES)
+        return f"{self.fingerprint}|{lengths}"
+
+    def prepare_batch(self, texts):
+        return prepare_texts(texts, self.preprocessor)
+
+    def predict_batch(self, texts, max_batch_tokens=4096, max_batch_size=64):
+        """Score many texts, returning (labels, confidences) in input order."""
+        return self.score_processed(self.prepare_batch(texts), max_batch_tokens, max_batch_size)
+
+    def predict_proba(self, texts, max_batch_tokens=4096, max_batch_size=64):
+        """Class probabilities (ordered as self.labels) for each text, in input order."""
+        processed = self.prepare_batch(texts)
+        probabilities = [None] * len(processed)
+        for batch, probs in self._batched_probs(processed, max_batch_tokens, max_batch_size):
+            for idx, row in zip(batch, probs.tolist()):
+                probabilities[idx] = row
+        return probabilities
+
+    def score_processed(self, processed, max_batch_tokens=4096, max_batch_size=64):
+        """Like predict_batch, for texts that already went through _prepare."""
+        labels = [None] * len(processed)
+        confidences = [None] * len(processed)
+        for batch, probs in self._batched_probs(processed, max_batch_tokens, max_batch_size):
+            top_probs, top_idx = probs.max(dim=-1)
+            for idx, pred_idx, prob in zip(batch, top_idx.tolist(), top_probs.tolist()):
+                labels[idx] = self.labels[pred_idx]
+                confidences[idx] = prob * 100
+        return labels, confidences
+
+    def _batched_probs(self, processed, max_batch_tokens, max_batch_size):
+        import torch.nn.functional as F
+
+        if not processed:
+            return
+        # Prepared native text still carries Telugu script and prepared
+        # romanized text never does, so the route can be read back here.
+        native = route_texts(pd.Series(processed, dtype=object)).tolist()
+        for route in ROUTES:
+            indices = [idx for idx, is_native in enumerate(native) if is_native == (route == "native")]
+            if not indices:
+                continue
+            with self._tokenizer_lock:
+                encodings = self.tokenizer(
+                    [processed[idx] for idx in indices], truncation=True, max_length=self.route_max_length.get(route)
+                )
+            lengths = [len(ids) for ids in encodings["input_ids"]]
+
+            for batch in self._length_buckets(lengths, max_batch_tokens, max_batch_size):
+                features = [{key: encodings[key][idx] for key in encodings.keys()} for idx in batch]
+                inputs = self.tokenizer.pad(features, padding=True, return_tensors="pt")
+                logits = self.backend(inputs)
+                yield [indices[idx] for idx in batch], F.softmax(logits.float(), dim=-1).cpu()
+
+def compare_backends(texts, model_name=DEFAULT_MODEL_NAME, baseline="torch", candidates=("torch-int8", "onnx"), device="cpu"):
+    """Accuracy parity of each candidate backend against the baseline.
+
+    Returns {backend: {"rows", "label_agreement", "max_prob_drift"}}, where
+    label_agreement is the share of texts with the same predicted label and
+    max_prob_drift is the largest absolute difference in any class
+    probability.
+    """
+    reference = MuRILSentiment(model_name=model_name, device=device, backend=baseline).predict_proba(texts)
+    report = {}
+    for backend in candidates:
+        probs = MuRILSentiment(model_name=model_name, device=device, backend=backend).predict_proba(texts)
+        agree = sum(
+            max(range(len(ref)), key=ref.__getitem__) == max(range(len(row)), key=row.__getitem__)
+            for ref, row in zip(reference, probs)
+        )
+        drift = max((abs(a - b) for ref, row in zip(reference, probs) for a, b in zip(ref, row)), default=0.0)
+        report[backend] = {
+            "rows": len(texts),
+            "label_agreement": agree / len(texts) if texts else 1.0,
+            "max_prob_drift": drift,
+        }
+    return report
+
+# ------------------------
+# Model Registry
+# ------------------------
+# One warm MuRILSentiment per (model name, device, backend) for the life of the
+# process. Least recently used instances are unloaded once more than
+# MAX_LOADED_MODELS are held, and any instance idle for MODEL_IDLE_SECONDS is
+# dropped on the next registry access (0 disables the idle policy).
+MAX_LOADED_MODELS = int(os.environ.get("SENTIMENT_MAX_LOADED_MODELS", "1"))
+MODEL_IDLE_SECONDS = float(os.environ.get("SENTIMENT_MODEL_IDLE_SECONDS", "0"))
+
+_registry = OrderedDict()  # key -> (model, last_used)
+_registry_lock = threading.Lock()
+
+def _release_memory():
+    gc.collect()
+    torch = sys.modules.get("torch")
+    if torch is not None and torch.cuda.is_available():
+        torch.cuda.empty_cache()
+
+def _evict_locked(now):
+    evicted = []
+    if MODEL_IDLE_SECONDS > 0:
+        for key, (_, last_used) in list(_registry.items()):
+            if now - last_used > MODEL_IDLE_SECONDS:
+                evicted.append(_registry.pop(key)[0])
+    while len(_registry) > max(MAX_LOADED_MODELS, 1):
+        evicted.append(_registry.popitem(last=False)[1][0])
+    return evicted
+
+def get_model(model_name=DEFAULT_MODEL_NAME, device=None, backend=None):
+    backend = backend or SENTIMENT_BACKEND
+    key = (model_name, device or default_device(), backend)
+
+    # Loading happens under the lock so concurrent sessions asking for the
+    # same model wait for a single load instead of each reading the weights.
+    with _registry_lock:
+        now = time.monotonic()
+        if key in _registry:
+            model = _registry[key][0]
         else:
-            processed_text = self.preprocessor.preprocess(text)
+            model = MuRILSentiment(model_name=model_name, rules_dict=rules_dict, device=key[1], backend=backend)
+        _registry[key] = (model, now)
+        _registry.move_to_end(key)
+        evicted = _evict_locked(now)
 
-        inputs = self.tokenizer(processed_text, return_tensors="pt", truncation=True, padding=True).to(self.device)
+    if evicted:
+        del evicted
+        _release_memory()
+    return model
 
-        with torch.no_grad():
-            outputs = self.model(**inputs)
-            logits = outputs.logits
+def unload_models():
+    with _registry_lock:
+        _registry.clear()
+    _release_memory()
+
+def loaded_models():
+    with _registry_lock:
+        return list(_registry.keys())
 
-        probs = F.softmax(logits, dim=-1).squeeze().cpu().numpy()
-        pred_idx = probs.argmax()
-        sentiment = self.labels[pred_idx]
-        confidence = probs[pred_idx] * 100
-        return sentiment, confidence
+def warm_up(model_name=DEFAULT_MODEL_NAME, device=None, backend=None):
+    """Load the model and run one tiny batch so the first report starts hot."""
+    model = get_model(model_name=model_name, device=device, backend=backend)
+    model.predict_batch(["warm up"])
+    return model
+
+# ------------------------
+# Persistent Result Cache
+# ------------------------
+# Results are keyed by a hash of (model fingerprint and route max lengths,
+# rules version, prepared text), so editing rules_dict, switching weights or
+# changing a truncation length never serves stale labels.
+# Rows written under an older revision or rules version of the same model and
+# backend are purged when the cache is opened; other backends' rows are kept,
+# since processes running different backends can share one cache file.
+SENTIMENT_CACHE_PATH = os.environ.get(
+    "SENTIMENT_CACHE_PATH",
+    os.path.join(os.path.expanduser("~"), ".cache", "instagram_sentiment", "sentiment_cache.sqlite"),
+)
+SENTIMENT_CACHE_MAX_ENTRIES = int(os.environ.get("SENTIMENT_CACHE_MAX_ENTRIES", "500000"))
+
+def _fingerprint_backend(fingerprint):
+    """The backend suffix of a (cache) fingerprint ("" for torch)."""
+    return fingerprint.partition("|")[0].rpartition("@")[2].partition("+")[2]
+
+class SentimentCache:
+    _QUERY_CHUNK = 500  # stay well below SQLite's bound-parameter limit
+
+    def __init__(self, model_name, model_version, rules_version, path=SENTIMENT_CACHE_PATH, max_entries=SENTIMENT_CACHE_MAX_ENTRIES):
+        self.model_name = model_name
+        self.model_version = model_version
+        self.rules_version = rules_version
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS sentiment_cache ("
+                "key TEXT PRIMARY KEY, model_name TEXT, model_version TEXT, rules_version TEXT, "
+                "label TEXT, confidence REAL, last_used REAL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_sentiment_cache_last_used ON sentiment_cache(last_used)")
+            versions = self._conn.execute(
+                "SELECT DISTINCT model_version, rules_version FROM sentiment_cache WHERE model_name = ?", (model_name,)
+            ).fetchall()
+            stale = [
+                (model_name, version, rules) for version, rules in versions
+                if _fingerprint_backend(version) == _fingerprint_backend(model_version)
+                and (version, rules) != (model_version, rules_version)
+            ]
+            self._conn.executemany(
+                "DELETE FROM sentiment_cache WHERE model_name = ? AND model_version = ? AND rules_version = ?", stale
+            )
+
+    def _key(self, text):
+        raw = "\0".join([self.model_version, self.rules_version, text])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get_many(self, texts):
+        """Return {text: (label, confidence)} for the texts already cached."""
+        keys = {self._key(text): text for text in texts}
+        found = {}
+        key_list = list(keys)
+        with self._lock, self._conn:
+            for start in range(0, len(key_list), self._QUERY_CHUNK):
+                chunk = key_list[start:start + self._QUERY_CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, label, confidence FROM sentiment_cache WHERE key IN ({placeholders})", chunk
+                ).fetchall()
+                for key, label, confidence in rows:
+                    found[keys[key]] = (label, confidence)
+                if rows:
+                    now = time.time()
+                    self._conn.executemany(
+                        "UPDATE sentiment_cache SET last_used = ? WHERE key = ?", [(now, row[0]) for row in rows]
+                    )
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, results):
+        """Store {text: (label, confidence)} and trim the cache to max_entries."""
+        now = time.time()
+        rows = [
+            (self._key(text), self.model_name, self.model_version, self.rules_version, label, float(confidence), now)
+            for text, (label, confidence) in results.items()
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO sentiment_cache VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            total = self._conn.execute("SELECT COUNT(*) FROM sentiment_cache").fetchone()[0]
+            if total > self.max_entries:
+                # Trim to 90% so eviction is not paid again on the very next insert.
+                excess = total - int(self.max_entries * 0.9)
+                self._conn.execute(
+                    "DELETE FROM sentiment_cache WHERE key IN "
+                    "(SELECT key FROM sentiment_cache ORDER BY last_used ASC LIMIT ?)",
+                    (excess,),
+                )
+
+    def stats(self):
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM sentiment_cache").fetchone()[0]
+            return {"hits": self.hits, "misses": self.misses, "entries": entries}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+def get_cache(model, path=SENTIMENT_CACHE_PATH):
+    key = (path, model.cache_fingerprint, model.preprocessor.version)
+    with _caches_lock:
+        if key not in _caches:
+            _caches[key] = SentimentCache(model.model_name, model.cache_fingerprint, model.preprocessor.version, path=path)
+        return _caches[key]
+
+# ------------------------
+# Multi-process Scoring
+# ------------------------
+# Splits texts into shards scored by a pool of worker processes. Each worker
+# loads its model once (through the registry, in its own process) and caps
+# torch's intra-op threads so workers * threads stays within the core count.
+# Pools are kept for reuse across reports; shutdown_pools() releases them.
+SENTIMENT_WORKERS = os.environ.get("SENTIMENT_WORKERS")  # None, an int, or "auto"
+SENTIMENT_THREADS_PER_WORKER = os.environ.get("SENTIMENT_THREADS_PER_WORKER", "auto")
+MIN_TEXTS_PER_WORKER = 64  # below this, process start-up costs more than it saves
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+def cpu_count():
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+def resolve_parallelism(workers="auto", threads_per_worker="auto"):
+    """Turn "auto" settings into concrete (workers, threads_per_worker)."""
+    cores = cpu_count()
+    if threads_per_worker == "auto":
+        threads_per_worker = min(4, cores) if workers == "auto" else max(1, cores // max(int(workers), 1))
+    threads_per_worker = max(int(threads_per_worker), 1)
+    if workers == "auto":
+        workers = cores // threads_per_worker
+    return max(int(workers), 1), threads_per_worker
+
+def _init_worker(model_name, backend, threads):
+    import torch
+
+    torch.set_num_threads(threads)
+    torch.set_num_interop_threads(1)
+    get_model(model_name=model_name, device="cpu", backend=backend)
+
+def _score_shard(model_name, backend, texts, max_batch_tokens):
+    model = get_model(model_name=model_name, device="cpu", backend=backend)
+    return model.score_processed(texts, max_batch_tokens=max_batch_tokens)
+
+def _get_pool(model_name, backend, workers, threads):
+    key = (model_name, backend, workers, threads)
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(model_name, backend, threads),
+            )
+        return _pools[key]
+
+def shutdown_pools():
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.shutdown()
+
+def score_parallel(texts, model_name=DEFAULT_MODEL_NAME, backend=None, workers="auto", threads_per_worker="auto", max_batch_tokens=4096):
+    """score_processed across a process pool; results come back in input order."""
+    backend = backend or SENTIMENT_BACKEND
+    workers, threads = resolve_parallelism(workers, threads_per_worker)
+    workers = min(workers, max(len(texts) // MIN_TEXTS_PER_WORKER, 1))
+    if workers == 1:
+        model = get_model(model_name=model_name, device="cpu", backend=backend)
+        return model.score_processed(texts, max_batch_tokens=max_batch_tokens)
+
+    # A few shards per worker so one slow shard of long comments does not
+    # leave the other workers idle at the end.
+    n_shards = min(workers * 4, len(texts))
+    bounds = [len(texts) * i // n_shards for i in range(n_shards + 1)]
+    shards = [texts[start:end] for start, end in zip(bounds, bounds[1:])]
+
+    pool = _get_pool(model_name, backend, workers, threads)
+    futures = [pool.submit(_score_shard, model_name, backend, shard, max_batch_tokens) for shard in shards]
+    labels, confidences = [], []
+    for future in futures:
+        shard_labels, shard_confidences = future.result()
+        labels.extend(shard_labels)
+        confidences.extend(shard_confidences)
+    return labels, confidences
+
+# ------------------------
+# Sentiment Server Client
+# ------------------------
+# When SENTIMENT_SERVER_URL (or server_url) points at a running
+# sentiment_server.py, analyze_comments sends the forward pass there instead
+# of loading the model in this process.
+SENTIMENT_SERVER_URL = os.environ.get("SENTIMENT_SERVER_URL")
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+def get_client(url):
+    from sentiment_server import SentimentClient
+
+    with _clients_lock:
+        if url not in _clients:
+            _clients[url] = SentimentClient(url)
+        return _clients[url]
 
 # ------------------------
 # Emoji Removal Function
@@ -328,17 +1171,68 @@ def remove_emojis(text):
 # ------------------------
 # Sentiment Analysis on DataFrame
 # ------------------------
-def analyze_comments(df: pd.DataFrame, column="Comments") -> pd.DataFrame:
+def analyze_comments(df: pd.DataFrame, column="Comments", max_batch_tokens=4096, model_name=DEFAULT_MODEL_NAME, use_cache=True, backend=None, workers=SENTIMENT_WORKERS, threads_per_worker=SENTIMENT_THREADS_PER_WORKER, cascade=True, cascade_threshold=CASCADE_THRESHOLD, server_url=SENTIMENT_SERVER_URL) -> pd.DataFrame:
     original_comments = df[column].copy()
-    temp_comments = df[column].fillna("").astype(str).apply(remove_emojis).str.strip()
+    raw_comments = df[column].fillna("").astype(str)
+    sentiments = [None] * len(raw_comments)
+    confidences = [None] * len(raw_comments)
 
-    model = MuRILSentiment(model_name="DSL-13-SRMAP/MuRIL_WR", rules_dict=rules_dict)
-    sentiments, confidences = [], []
+    # Stage 1: settle trivial comments from the lexicon, once per distinct text.
+    pending = list(range(len(raw_comments)))
+    if cascade:
+        lexicon = LexiconClassifier(rules_dict)
+        verdicts = {text: lexicon.classify(text) for text in dict.fromkeys(raw_comments)}
+        pending = []
+        for idx, text in enumerate(raw_comments):
+            verdict = verdicts[text]
+            if verdict is not None and verdict[1] >= cascade_threshold:
+                sentiments[idx], confidences[idx] = verdict
+            else:
+                pending.append(idx)
 
-    for text in tqdm(temp_comments, desc="Analyzing Sentiments", disable=True):
-        sentiment, confidence = model.predict(text)
-        sentiments.append(sentiment)
-        confidences.append(confidence)
+    # Stage 2: the model, for whatever the lexicon could not settle.
+    distinct, misses = [], []
+    if pending:
+        temp_comments = raw_comments.iloc[pending].apply(remove_emojis).str.strip()
+        if server_url:
+            model = get_client(server_url)
+        else:
+            model = get_model(model_name=model_name, backend=backend)
+        processed = model.prepare_batch(temp_comments.tolist())
+
+        # Score each distinct prepared text once; repeated spam collapses to
+        # a single entry here.
+        distinct = list(dict.fromkeys(processed))
+        cache = get_cache(model) if use_cache else None
+        results = cache.get_many(distinct) if cache else {}
+        misses = [text for text in distinct if text not in results]
+        if misses:
+            if workers and model.device == "cpu":
+                labels, scores = score_parallel(
+                    misses, model_name=model_name, backend=model.backend_name,
+                    workers=workers, threads_per_worker=threads_per_worker, max_batch_tokens=max_batch_tokens,
+                )
+            else:
+                labels, scores = model.score_processed(misses, max_batch_tokens=max_batch_tokens)
+            fresh = dict(zip(misses, zip(labels, scores)))
+            if cache:
+                cache.put_many(fresh)
+            results.update(fresh)
+
+        for idx, text in zip(pending, processed):
+            sentiments[idx], confidences[idx] = results[text]
+
+    stages = {"lexicon": len(raw_comments) - len(pending), "model": len(pending)}
+    stage_counts.update(stages)
+    df.attrs["sentiment_stats"] = {
+        "rows": len(raw_comments),
+        "routes": route_counts(raw_comments),
+        "model_routes": route_counts(raw_comments.iloc[pending]),
+        "stages": stages,
+        "distinct_texts": len(distinct),
+        "cache_hits": len(distinct) - len(misses),
+        "model_scored": len(misses),
+    }
 
     df['Sentiment_label'] = sentiments
     df['Confidence_score'] = confidences
@@ -347,3 +1241,43 @@ def analyze_comments(df: pd.DataFrame, column="Comments") -> pd.DataFrame:
     df[column] = original_comments
 
     return df
+
+def _frames(data, column, chunk_size):
+    if isinstance(data, pd.DataFrame):
+        for start in range(0, len(data), chunk_size):
+            yield data.iloc[start:start + chunk_size].copy()
+        return
+
+    pending = []
+    for item in data:
+        if isinstance(item, pd.DataFrame):
+            if pending:
+                yield pd.DataFrame({column: pending})
+                pending = []
+            yield item
+            continue
+        pending.append(item)
+        if len(pending) >= chunk_size:
+            yield pd.DataFrame({column: pending})
+            pending = []
+    if pending:
+        yield pd.DataFrame({column: pending})
+
+def analyze_comments_iter(data, column="Comments", chunk_size=1000, progress_callback=None, **options):
+    """Score comments chunk by chunk, yielding each scored DataFrame as it finishes.
+
+    data may be a DataFrame (sliced into chunk_size rows), an iterable of
+    DataFrames such as pd.read_csv(path, chunksize=...) for files larger than
+    memory, or an iterable of comment strings. progress_callback, if given, is
+    called as progress_callback(rows_done, rows_total) after every chunk;
+    rows_total is None when the input length is not known up front. Other
+    keyword arguments are passed to analyze_comments.
+    """
+    total = len(data) if isinstance(data, pd.DataFrame) else None
+    done = 0
+    for frame in _frames(data, column, chunk_size):
+        scored = analyze_comments(frame, column=column, **options)
+        done += len(scored)
+        if progress_callback is not None:
+            progress_callback(done, total)
+        yield scored
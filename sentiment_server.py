@@ -0,0 +1,281 @@
+# ----------------------------------
+# sentiment_server.py
+# ----------------------------------
+# Local sentiment service: one warm MuRILSentiment behind a small HTTP server
+# on localhost, so Streamlit workers do not each load torch and the model.
+# Concurrent requests are gathered into micro-batches (up to max_batch_size
+# texts, waiting at most max_wait_ms for more to arrive) before each forward
+# pass.
+#
+#   python sentiment_server.py --port 8765 --backend torch-int8
+#   SENTIMENT_SERVER_URL=http://127.0.0.1:8765 streamlit run app.py
+#
+# Endpoints:
+#   POST /score    {"texts": [...]} texts already prepared by the client
+#   POST /predict  {"texts": [...]} raw comments, prepared server-side
+#   GET  /health   model fingerprint, route max lengths and rules version
+#   GET  /metrics  request, batch and latency counters
+import argparse
+import json
+import queue
+import threading
+import time
+import urllib.request
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import sentiment_model
+
+
+# ------------------------
+# Micro-batching
+# ------------------------
+class _Job:
+    __slots__ = ("texts", "enqueued", "done", "result", "error")
+
+    def __init__(self, texts):
+        self.texts = texts
+        self.enqueued = time.perf_counter()
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class MicroBatcher:
+    def __init__(self, model, max_batch_size=64, max_wait_ms=10, max_batch_tokens=4096):
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.max_batch_tokens = max_batch_tokens
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._queue_waits = deque(maxlen=2000)
+        self._batch_latencies = deque(maxlen=2000)
+        self.counters = {"requests": 0, "texts": 0, "batches": 0, "errors": 0, "inference_seconds": 0.0}
+        self._thread = threading.Thread(target=self._run, name="sentiment-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, texts):
+        """Queue prepared texts and block until their (labels, confidences) are ready."""
+        job = _Job(list(texts))
+        self._queue.put(job)
+        job.done.wait()
+        if job.error is not None:
+            raise job.error
+        return job.result
+
+    def _collect(self):
+        jobs = [self._queue.get()]
+        size = len(jobs[0].texts)
+        deadline = time.perf_counter() + self.max_wait
+        while size < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                job = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            jobs.append(job)
+            size += len(job.texts)
+        return jobs
+
+    def _score_alone(self, job):
+        try:
+            job.result = self.model.score_processed(job.texts, max_batch_tokens=self.max_batch_tokens)
+        except Exception as e:
+            job.error = e
+
+    def _run(self):
+        while True:
+            jobs = self._collect()
+            texts = [text for job in jobs for text in job.texts]
+            started = time.perf_counter()
+            try:
+                labels, confidences = self.model.score_processed(texts, max_batch_tokens=self.max_batch_tokens)
+                offset = 0
+                for job in jobs:
+                    end = offset + len(job.texts)
+                    job.result = (labels[offset:end], confidences[offset:end])
+                    offset = end
+            except Exception as e:
+                # Score each request on its own, so one bad request fails
+                # alone instead of taking the rest of the batch with it.
+                if len(jobs) == 1:
+                    jobs[0].error = e
+                else:
+                    for job in jobs:
+                        self._score_alone(job)
+            finished = time.perf_counter()
+            for job in jobs:
+                job.done.set()
+
+            with self._lock:
+                self.counters["requests"] += len(jobs)
+                self.counters["texts"] += len(texts)
+                self.counters["batches"] += 1
+                self.counters["errors"] += sum(job.error is not None for job in jobs)
+                self.counters["inference_seconds"] += finished - started
+                self._batch_latencies.append(finished - started)
+                self._queue_waits.extend(started - job.enqueued for job in jobs)
+
+    def metrics(self):
+        def percentile(values, q):
+            if not values:
+                return 0.0
+            ordered = sorted(values)
+            return ordered[min(int(q * len(ordered)), len(ordered) - 1)] * 1000
+
+        with self._lock:
+            metrics = dict(self.counters)
+            metrics["mean_batch_texts"] = metrics["texts"] / metrics["batches"] if metrics["batches"] else 0.0
+            metrics["queue_wait_ms_p50"] = percentile(self._queue_waits, 0.5)
+            metrics["queue_wait_ms_p95"] = percentile(self._queue_waits, 0.95)
+            metrics["batch_ms_p50"] = percentile(self._batch_latencies, 0.5)
+            metrics["batch_ms_p95"] = percentile(self._batch_latencies, 0.95)
+        metrics["queue_depth"] = self._queue.qsize()
+        return metrics
+
+
+# ------------------------
+# HTTP Server
+# ------------------------
+def make_handler(batcher, started_at):
+    model = batcher.model
+
+    class Handler(BaseHTTPRequestHandler):
+        def _send_json(self, status, payload):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == "/health":
+                self._send_json(200, {
+                    "status": "ok",
+                    "model": model.model_name,
+                    "fingerprint": model.fingerprint,
+                    "cache_fingerprint": model.cache_fingerprint,
+                    "rules_version": model.preprocessor.version,
+                    "backend": model.backend_name,
+                })
+            elif self.path == "/metrics":
+                metrics = batcher.metrics()
+                metrics["uptime_seconds"] = time.time() - started_at
+                self._send_json(200, metrics)
+            else:
+                self._send_json(404, {"error": "not found"})
+
+        def do_POST(self):
+            if self.path not in ("/score", "/predict"):
+                self._send_json(404, {"error": "not found"})
+                return
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+                texts = json.loads(self.rfile.read(length))["texts"]
+                if not isinstance(texts, list):
+                    raise ValueError("texts must be a list")
+                if self.path == "/score" and not all(isinstance(text, str) for text in texts):
+                    raise ValueError("texts must be strings")
+            except (ValueError, KeyError, TypeError) as e:
+                self._send_json(400, {"error": f"bad request: {e}"})
+                return
+
+            if self.path == "/predict":
+                texts = model.prepare_batch(["" if text is None else str(text) for text in texts])
+            try:
+                labels, confidences = batcher.submit(texts)
+            except Exception as e:
+                self._send_json(500, {"error": str(e)})
+                return
+            self._send_json(200, {"labels": labels, "confidences": confidences})
+
+        def log_message(self, format, *args):
+            pass  # keep the console quiet under load
+
+    return Handler
+
+
+def serve(host="127.0.0.1", port=8765, model_name=sentiment_model.DEFAULT_MODEL_NAME, backend=None, device=None,
+          max_batch_size=64, max_wait_ms=10, max_batch_tokens=4096):
+    model = sentiment_model.warm_up(model_name=model_name, device=device, backend=backend)
+    batcher = MicroBatcher(model, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms, max_batch_tokens=max_batch_tokens)
+    server = ThreadingHTTPServer((host, port), make_handler(batcher, time.time()))
+    server.daemon_threads = True
+    return server
+
+
+# ------------------------
+# Client
+# ------------------------
+class SentimentClient:
+    """Talks to a running sentiment_server in place of an in-process model.
+
+    Texts are prepared locally with the same preprocessor rules so that
+    analyze_comments can dedupe and cache them exactly as it does in process;
+    only the forward pass happens in the server.
+    """
+
+    device = "remote"
+    backend_name = "remote"
+
+    def __init__(self, url, timeout=300, request_texts=256):
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+        self.request_texts = request_texts
+        health = self._call("GET", "/health")
+        self.model_name = health["model"]
+        self.fingerprint = health["fingerprint"]
+        self.cache_fingerprint = health["cache_fingerprint"]
+        self.preprocessor = sentiment_model.EnhancedTeluguPreprocessor(sentiment_model.rules_dict)
+        if self.preprocessor.version != health["rules_version"]:
+            raise RuntimeError("sentiment server runs different preprocessing rules than this client")
+
+    def _call(self, method, path, payload=None):
+        data = json.dumps(payload).encode("utf-8") if payload is not None else None
+        request = urllib.request.Request(self.url + path, data=data, method=method, headers={"Content-Type": "application/json"})
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            return json.loads(response.read())
+
+    def prepare_batch(self, texts):
+        return sentiment_model.prepare_texts(texts, self.preprocessor)
+
+    def score_processed(self, processed, max_batch_tokens=None, max_batch_size=None):
+        # Requests are kept small so the server can interleave them with other
+        # users' requests instead of running one huge batch at a time.
+        labels, confidences = [], []
+        for start in range(0, len(processed), self.request_texts):
+            result = self._call("POST", "/score", {"texts": processed[start:start + self.request_texts]})
+            labels.extend(result["labels"])
+            confidences.extend(result["confidences"])
+        return labels, confidences
+
+    def predict_batch(self, texts, max_batch_tokens=None, max_batch_size=None):
+        return self.score_processed(self.prepare_batch(texts))
+
+    def metrics(self):
+        return self._call("GET", "/metrics")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local MuRIL sentiment server with micro-batching")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--model", default=sentiment_model.DEFAULT_MODEL_NAME)
+    parser.add_argument("--backend", default=None, choices=sentiment_model.BACKENDS)
+    parser.add_argument("--device", default=None)
+    parser.add_argument("--max-batch-size", type=int, default=64)
+    parser.add_argument("--max-wait-ms", type=float, default=10)
+    parser.add_argument("--max-batch-tokens", type=int, default=4096)
+    args = parser.parse_args()
+
+    server = serve(args.host, args.port, args.model, args.backend, args.device,
+                   args.max_batch_size, args.max_wait_ms, args.max_batch_tokens)
+    print(f"✅ Sentiment server listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.shutdown()